@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+
+import streamlit as st
+
+from dosimetry_app.datasets import (
+    activate_dataset,
+    get_supported_dataset_types,
+    save_uploaded_dataset,
+)
+from dosimetry_app.formulas import activate_formula, create_formula, safe_eval_formula
+from dosimetry_app.listings import (
+    cached_dataset_preview,
+    cached_environment_locations,
+    cached_environment_source_label,
+    cached_list_datasets,
+    cached_list_eligible_datasets,
+    cached_list_eligible_formulas,
+    cached_list_formulas,
+    cached_list_run_summaries,
+    cached_run_detail,
+    clear_dataset_listings,
+    clear_formula_listings,
+    dataset_registry_frame,
+    formula_registry_frame,
+    run_history_frame,
+)
+from dosimetry_app.settings import (
+    ENV_SOURCE_AUTO,
+    ENV_SOURCE_DATASET,
+    get_environment_settings,
+    save_environment_settings,
+)
+from dosimetry_app.ui import paginated_dataframe
+
+# The standalone admin pages and the portal tabs render these blocks; key_prefix keeps their widget keys apart.
+
+
+def render_environment_settings_block(key_prefix: str) -> None:
+    st.markdown("### Environmental Source Settings")
+    env_settings = get_environment_settings()
+    source_options = [ENV_SOURCE_DATASET, ENV_SOURCE_AUTO]
+    source_index = source_options.index(str(env_settings["env_source"])) if env_settings["env_source"] in source_options else 0
+
+    dataset_locations = cached_environment_locations()
+    dataset_location_options = [""] + dataset_locations
+    stored_location = str(env_settings["env_dataset_location"])
+    dataset_location_index = (
+        dataset_location_options.index(stored_location) if stored_location in dataset_location_options else 0
+    )
+
+    with st.form(f"{key_prefix}_environment_settings_form"):
+        env_source = st.selectbox("Temperature/Pressure Source", source_options, index=source_index)
+        env_dataset_location = st.selectbox(
+            "Location Target (used for Dataset and Auto source)",
+            dataset_location_options,
+            index=dataset_location_index,
+            format_func=lambda value: "Live auto-detection (IP/browser)" if value == "" else value,
+        )
+        settings_submitted = st.form_submit_button("Save Environmental Settings")
+
+    if settings_submitted:
+        try:
+            if env_source == ENV_SOURCE_DATASET and not dataset_locations:
+                raise ValueError("No active environmental_data dataset locations available.")
+            save_environment_settings(
+                env_source=env_source,
+                env_manual_temperature_c=float(env_settings["env_manual_temperature_c"]),
+                env_manual_pressure_kpa=float(env_settings["env_manual_pressure_kpa"]),
+                env_dataset_location=env_dataset_location,
+            )
+            cached_environment_source_label.clear()
+            st.success("Environmental settings saved.")
+            st.rerun()
+        except Exception as exc:
+            st.error(f"Failed to save settings: {exc}")
+
+    st.caption(
+        "Calculator uses fetched temperature/pressure from dataset or live weather. "
+        "No manual typing is required in calculator or admin."
+    )
+
+
+def render_datasets_block(
+    user: dict,
+    key_prefix: str,
+    load_datasets: Callable[[], list[dict]] = cached_list_datasets,
+    invalidate_datasets: Callable[[], None] = clear_dataset_listings,
+) -> None:
+    st.markdown("### Upload Dataset")
+    with st.form(f"{key_prefix}_upload_dataset_form"):
+        dataset_type = st.selectbox(
+            "Dataset Type", get_supported_dataset_types(), key=f"{key_prefix}_dataset_type"
+        )
+        file = st.file_uploader(
+            "Dataset File (CSV/XLSX)", type=["csv", "xlsx", "xls"], key=f"{key_prefix}_dataset_file"
+        )
+        notes = st.text_input("Notes", value="", key=f"{key_prefix}_dataset_notes")
+        uploaded = st.form_submit_button("Upload Dataset")
+
+    if uploaded:
+        if not file:
+            st.error("Please choose a file.")
+        else:
+            dataset_id, errors = save_uploaded_dataset(
+                dataset_type=dataset_type,
+                uploaded_file=file,
+                uploaded_by=user["username"],
+                notes=notes or None,
+            )
+            invalidate_datasets()
+            if errors:
+                st.error(f"Dataset v{dataset_id} uploaded but failed validation.")
+                for err in errors:
+                    st.write(f"- {err}")
+            else:
+                st.success(f"Dataset uploaded successfully. Record ID: {dataset_id}")
+
+    st.markdown("### Activate Dataset Version")
+    all_rows = load_datasets()
+    eligible = cached_list_eligible_datasets()
+    if eligible:
+        eligible_by_id = {row["id"]: row for row in eligible}
+        selected_id = st.selectbox(
+            "Choose dataset version",
+            list(eligible_by_id),
+            format_func=lambda row_id: (
+                f"id={row_id} | {eligible_by_id[row_id]['dataset_type']} v{eligible_by_id[row_id]['version']}"
+            ),
+            key=f"{key_prefix}_dataset_activate_select",
+        )
+        if st.button("Activate Selected Dataset", key=f"{key_prefix}_dataset_activate_button"):
+            try:
+                activate_dataset(selected_id)
+                invalidate_datasets()
+                st.success("Dataset activated.")
+                st.rerun()
+            except Exception as exc:
+                st.error(f"Activation failed: {exc}")
+    else:
+        st.info("No eligible inactive datasets to activate.")
+
+    st.markdown("### Dataset Registry")
+    if all_rows:
+        paginated_dataframe(dataset_registry_frame(all_rows), key=f"{key_prefix}_dataset_registry_page")
+    else:
+        st.info("No datasets found.")
+
+    st.markdown("### Active Dataset Preview")
+    # Rows are ordered by version descending, so the first active row per type matches get_active_dataset_metadata.
+    active_by_type: dict[str, dict] = {}
+    for row in all_rows:
+        if row["status"] == "active":
+            active_by_type.setdefault(row["dataset_type"], row)
+    for dataset_type in get_supported_dataset_types():
+        metadata = active_by_type.get(dataset_type)
+        preview = (
+            cached_dataset_preview(int(metadata["id"]), str(metadata.get("checksum") or ""))
+            if metadata
+            else None
+        )
+        with st.expander(dataset_type):
+            if metadata is None or preview is None:
+                st.write("No active dataset")
+            else:
+                st.write(f"Version: {metadata['version']} | Uploaded by: {metadata['uploaded_by']}")
+                st.dataframe(preview, use_container_width=True)
+
+
+def render_formulas_block(
+    user: dict,
+    key_prefix: str,
+    load_formulas: Callable[[], list[dict]] = cached_list_formulas,
+    invalidate_formulas: Callable[[], None] = clear_formula_listings,
+) -> None:
+    st.markdown("### Create Formula")
+    with st.form(f"{key_prefix}_create_formula_form"):
+        name = st.text_input("Formula Name", value="dw_custom", key=f"{key_prefix}_formula_name")
+        beam_type = st.selectbox("Beam Type", ["photon", "electron"], key=f"{key_prefix}_formula_beam_type")
+        expression = st.text_area(
+            "Expression",
+            value="M_Q * N_Dw_60Co * k_Q * depth_factor",
+            height=100,
+            key=f"{key_prefix}_formula_expression",
+        )
+        variables_raw = st.text_input(
+            "Variables (comma-separated)",
+            value="M_Q, N_Dw_60Co, k_Q, depth_factor",
+            key=f"{key_prefix}_formula_variables",
+        )
+        units_raw = st.text_area(
+            "Units JSON",
+            value='{"output":"Gy per measurement"}',
+            height=80,
+            key=f"{key_prefix}_formula_units",
+        )
+        notes = st.text_input("Notes", value="", key=f"{key_prefix}_formula_notes")
+        create_submitted = st.form_submit_button("Create Formula")
+
+    if create_submitted:
+        variables = [value.strip() for value in variables_raw.split(",") if value.strip()]
+        try:
+            units = json.loads(units_raw) if units_raw.strip() else {}
+        except json.JSONDecodeError as exc:
+            st.error(f"Invalid Units JSON: {exc}")
+            units = None
+
+        if units is not None:
+            formula_id, errors = create_formula(
+                name=name.strip(),
+                beam_type=beam_type,
+                expression=expression.strip(),
+                variables=variables,
+                units=units,
+                created_by=user["username"],
+                notes=notes or None,
+            )
+            invalidate_formulas()
+            if errors:
+                st.error(f"Formula created (id={formula_id}) but failed validation.")
+                for err in errors:
+                    st.write(f"- {err}")
+            else:
+                st.success(f"Formula created successfully (id={formula_id}).")
+
+    all_formulas = load_formulas()
+
+    st.markdown("### Test Formula")
+    if all_formulas:
+        formulas_by_id = {row["id"]: row for row in all_formulas}
+        selected_id = st.selectbox(
+            "Formula",
+            list(formulas_by_id),
+            format_func=lambda row_id: (
+                f"id={row_id} | {formulas_by_id[row_id]['beam_type']} | {formulas_by_id[row_id]['name']} "
+                f"v{formulas_by_id[row_id]['version']} ({formulas_by_id[row_id]['status']})"
+            ),
+            key=f"{key_prefix}_formula_test_select",
+        )
+        selected = formulas_by_id[selected_id]
+        st.code(selected["expression"])
+        test_values = st.text_area(
+            "Test values JSON",
+            value='{"M_Q": 1.0, "N_Dw_60Co": 5.233e7, "k_Q": 0.973, "depth_factor": 1.0}',
+            key=f"{key_prefix}_formula_test_values",
+        )
+        if st.button("Run Test Evaluation", key=f"{key_prefix}_formula_test_run"):
+            try:
+                values = json.loads(test_values)
+                output = safe_eval_formula(selected["expression"], values)
+                st.success(f"Result: {output}")
+            except Exception as exc:
+                st.error(f"Test evaluation failed: {exc}")
+    else:
+        st.info("No formulas available.")
+
+    st.markdown("### Activate Formula")
+    eligible = cached_list_eligible_formulas()
+    if eligible:
+        eligible_by_id = {row["id"]: row for row in eligible}
+        activate_id = st.selectbox(
+            "Eligible formulas",
+            list(eligible_by_id),
+            format_func=lambda row_id: (
+                f"id={row_id} | {eligible_by_id[row_id]['beam_type']} | "
+                f"{eligible_by_id[row_id]['name']} v{eligible_by_id[row_id]['version']}"
+            ),
+            key=f"{key_prefix}_formula_activate_select",
+        )
+        if st.button("Activate Selected Formula", key=f"{key_prefix}_formula_activate_button"):
+            try:
+                activate_formula(activate_id)
+                invalidate_formulas()
+                st.success("Formula activated.")
+                st.rerun()
+            except Exception as exc:
+                st.error(f"Activation failed: {exc}")
+    else:
+        st.info("No eligible formulas to activate.")
+
+    st.markdown("### Formula Registry")
+    if all_formulas:
+        paginated_dataframe(formula_registry_frame(all_formulas), key=f"{key_prefix}_formula_registry_page")
+    else:
+        st.info("No formulas found.")
+
+
+def render_run_history_block(key_prefix: str) -> None:
+    limit = st.slider("Rows", min_value=10, max_value=500, value=100, step=10, key=f"{key_prefix}_history_rows")
+    rows = cached_list_run_summaries(limit=limit)
+
+    if not rows:
+        st.info("No calculation runs available.")
+        return
+
+    paginated_dataframe(run_history_frame(rows), key=f"{key_prefix}_run_history_page")
+
+    selected_id = st.number_input(
+        "Inspect run id",
+        min_value=1,
+        step=1,
+        value=int(rows[0]["id"]),
+        key=f"{key_prefix}_history_run_id",
+    )
+    selected = cached_run_detail(int(selected_id))
+    if selected:
+        st.markdown("### Selected Run Details")
+        st.write(f"Timestamp: `{selected['run_ts']}`")
+        st.write(f"User: `{selected['username']}`")
+        st.write(f"Formula: `{selected['formula_name']} v{selected['formula_version']}`")
+        st.markdown("Inputs")
+        st.json(selected["inputs"])
+        st.markdown("Outputs")
+        st.json(selected["outputs"])
+        st.markdown("Dataset Versions")
+        st.json(selected["dataset_versions"])
+    else:
+        st.warning("Run not found for selected id.")
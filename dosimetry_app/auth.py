@@ -1,11 +1,19 @@
+import hashlib
+import hmac
 import os
+import time
 
-from dosimetry_app.database import execute, query_one
-from dosimetry_app.security import hash_password, verify_password
+from dosimetry_app.database import execute, query_one, query_row
+from dosimetry_app.security import hash_password, needs_rehash, verify_password
 
 DEFAULT_ADMIN_USERNAME = "admin"
 DEFAULT_ADMIN_PASSWORD = "admin123"
 
+VERIFIED_CREDENTIAL_TTL_SECONDS = 60.0
+_VERIFIED_CREDENTIAL_CACHE_MAX_ENTRIES = 256
+_VERIFIED_CREDENTIAL_CACHE: dict[tuple[str, str], float] = {}
+_CREDENTIAL_CACHE_PEPPER = os.urandom(32)
+
 
 def _read_streamlit_secret(key: str) -> str | None:
     try:
@@ -56,13 +64,15 @@ def get_bootstrap_admin_credentials() -> tuple[str, str]:
 
 def ensure_default_admin() -> None:
     username, password = get_bootstrap_admin_credentials()
-    existing = query_one("SELECT id FROM users WHERE username = ?", (username,))
+    # The probe only exists to skip hash_password; the insert itself is conflict-safe.
+    existing = query_row("SELECT 1 FROM users WHERE username = ?", (username,))
     if existing:
         return
     execute(
         """
         INSERT INTO users (username, password_hash, role)
         VALUES (?, ?, ?)
+        ON CONFLICT(username) DO NOTHING
         """,
         (username, hash_password(password), "admin"),
     )
@@ -78,6 +88,31 @@ def create_user(username: str, password: str, role: str) -> int:
     )
 
 
+def _credential_cache_key(stored_hash: str, password: str) -> tuple[str, str]:
+    # Keyed on the stored hash so a password change invalidates earlier entries.
+    digest = hmac.new(_CREDENTIAL_CACHE_PEPPER, password.encode("utf-8"), hashlib.sha256).hexdigest()
+    return stored_hash, digest
+
+
+def _verify_password_cached(password: str, stored_hash: str) -> bool:
+    key = _credential_cache_key(stored_hash, password)
+    now = time.monotonic()
+    verified_at = _VERIFIED_CREDENTIAL_CACHE.get(key)
+    if verified_at is not None and now - verified_at < VERIFIED_CREDENTIAL_TTL_SECONDS:
+        return True
+
+    if not verify_password(password, stored_hash):
+        _VERIFIED_CREDENTIAL_CACHE.pop(key, None)
+        return False
+
+    if len(_VERIFIED_CREDENTIAL_CACHE) >= _VERIFIED_CREDENTIAL_CACHE_MAX_ENTRIES:
+        oldest_key = next(iter(_VERIFIED_CREDENTIAL_CACHE))
+        _VERIFIED_CREDENTIAL_CACHE.pop(oldest_key, None)
+    _VERIFIED_CREDENTIAL_CACHE.pop(key, None)
+    _VERIFIED_CREDENTIAL_CACHE[key] = now
+    return True
+
+
 def authenticate(username: str, password: str) -> dict | None:
     user = query_one(
         """
@@ -89,8 +124,14 @@ def authenticate(username: str, password: str) -> dict | None:
     )
     if not user:
         return None
-    if not verify_password(password, user["password_hash"]):
+    if not _verify_password_cached(password, user["password_hash"]):
         return None
+    if needs_rehash(user["password_hash"]):
+        # Upgrade hashes created under a different work factor on successful login.
+        execute(
+            "UPDATE users SET password_hash = ? WHERE id = ?",
+            (hash_password(password), user["id"]),
+        )
     return {
         "id": user["id"],
         "username": user["username"],
@@ -9,10 +9,34 @@ import pandas as pd
 from dosimetry_app.config import DEFAULT_P0_KPA, DEFAULT_T0_C
 from dosimetry_app.datasets import (
     get_active_dataset,
+    get_active_dataset_metadata,
     get_active_dataset_versions,
     get_chamber_defaults,
 )
-from dosimetry_app.formulas import get_active_formula, safe_eval_formula
+from dosimetry_app.formulas import get_active_formula, safe_eval_formula, safe_eval_formula_batch
+
+BATCH_MEASUREMENT_COLUMNS = (
+    "M_raw",
+    "MU_meas",
+    "T_meas_C",
+    "P_meas_kPa",
+    "M_high",
+    "M_low",
+    "V_high",
+    "V_low",
+    "M_pos",
+    "M_neg",
+    "M_ref",
+)
+DEPTH_TABLE_COLUMNS = ["energy_mv", "field_size_cm", "depth_cm", "value"]
+
+KqCurves = dict[str, tuple[np.ndarray, np.ndarray]]
+DepthCurves = dict[tuple[float, float], tuple[np.ndarray, np.ndarray]]
+DepthTable = tuple[np.ndarray, dict[float, np.ndarray], DepthCurves]
+
+_LOOKUP_CACHE_MAX_ENTRIES = 8
+_KQ_CURVES_CACHE: dict[int, KqCurves] = {}
+_DEPTH_TABLE_CACHE: dict[tuple[str, int], DepthTable] = {}
 
 
 def to_coulomb(reading: float, unit: str) -> float:
@@ -56,7 +80,7 @@ def compute_k_q_trs398(tpr: float, a: float, b: float) -> float:
         raise ValueError("TPR20,10 must be positive.")
     numerator = 1.0 - math.exp((a - 0.57) / b)
     denominator = 1.0 - math.exp((a - tpr) / b)
-    if math.isclose(denominator, 0.0):
+    if denominator == 0.0:
         raise ValueError("TRS-398 k_Q denominator is zero; check a, b, and TPR20,10 values.")
     return numerator / denominator
 
@@ -69,17 +93,15 @@ def compute_p_ion_two_voltage(
 ) -> float:
     if any(value <= 0 for value in (m_high, m_low, v_high, v_low)):
         raise ValueError("Two-voltage inputs must be > 0.")
-    if math.isclose(v_high, v_low):
+    # Same tolerance as math.isclose's default rel_tol; both voltages are positive here.
+    if abs(v_high - v_low) <= 1e-09 * max(v_high, v_low):
         raise ValueError("v_high and v_low cannot be equal.")
 
-    if v_high < v_low:
-        v_high, v_low = v_low, v_high
-        m_high, m_low = m_low, m_high
-
-    voltage_ratio = v_high / v_low
-    reading_ratio = m_high / m_low
+    swapped = v_high < v_low
+    voltage_ratio = max(v_high, v_low) / min(v_high, v_low)
+    reading_ratio = (m_low / m_high) if swapped else (m_high / m_low)
     denominator = reading_ratio - voltage_ratio
-    if math.isclose(denominator, 0.0):
+    if denominator == 0.0:
         raise ValueError("Invalid two-voltage readings: denominator is zero.")
     return (1.0 - voltage_ratio) / denominator
 
@@ -91,37 +113,187 @@ def compute_p_pol(m_pos: float, m_neg: float, m_ref: float | None = None) -> flo
     return (abs(m_pos) + abs(m_neg)) / (2.0 * reference)
 
 
-def _interpolate_by_depth(frame: pd.DataFrame, depth_cm: float) -> float:
-    sorted_frame = frame.sort_values("depth_cm")
-    x = sorted_frame["depth_cm"].astype(float).to_numpy()
-    y = sorted_frame["value"].astype(float).to_numpy()
-    if depth_cm < x.min() or depth_cm > x.max():
+def compute_p_tp_batch(
+    t_meas_c: np.ndarray,
+    p_meas_kpa: np.ndarray,
+    t0_c: float = DEFAULT_T0_C,
+    p0_kpa: float = DEFAULT_P0_KPA,
+) -> np.ndarray:
+    t_meas_c, p_meas_kpa = np.broadcast_arrays(
+        np.asarray(t_meas_c, dtype=np.float64),
+        np.asarray(p_meas_kpa, dtype=np.float64),
+    )
+    if p0_kpa <= 0 or np.any(p_meas_kpa <= 0):
+        raise ValueError("Pressure values must be > 0.")
+    # Same operation order as compute_p_tp, accumulated in place to skip temporaries.
+    result = np.add(t_meas_c, 273.15)
+    result *= p0_kpa
+    result /= np.multiply(p_meas_kpa, 273.15 + t0_c)
+    return result
+
+
+def compute_k_tp_trs398_batch(
+    t_meas_c: np.ndarray,
+    p_meas_kpa: np.ndarray,
+    t0_c: float,
+    p0_kpa: float,
+) -> np.ndarray:
+    t_meas_c, p_meas_kpa = np.broadcast_arrays(
+        np.asarray(t_meas_c, dtype=np.float64),
+        np.asarray(p_meas_kpa, dtype=np.float64),
+    )
+    if p0_kpa <= 0 or np.any(p_meas_kpa <= 0):
+        raise ValueError("Pressure values must be > 0.")
+    result = np.multiply(p_meas_kpa, 273.15 + t0_c)
+    denominator = np.add(t_meas_c, 273.15)
+    denominator *= p0_kpa
+    result /= denominator
+    return result
+
+
+def compute_p_ion_two_voltage_batch(
+    m_high: np.ndarray,
+    m_low: np.ndarray,
+    v_high: np.ndarray,
+    v_low: np.ndarray,
+) -> np.ndarray:
+    m_high, m_low, v_high, v_low = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (m_high, m_low, v_high, v_low))
+    )
+    if np.any((m_high <= 0) | (m_low <= 0) | (v_high <= 0) | (v_low <= 0)):
+        raise ValueError("Two-voltage inputs must be > 0.")
+    if np.any(np.abs(v_high - v_low) <= 1e-09 * np.maximum(np.abs(v_high), np.abs(v_low))):
+        raise ValueError("v_high and v_low cannot be equal.")
+
+    swapped = v_high < v_low
+    voltage_ratio = np.maximum(v_high, v_low) / np.minimum(v_high, v_low)
+    reading_ratio = np.where(swapped, m_low / m_high, m_high / m_low)
+    denominator = reading_ratio - voltage_ratio
+    if np.any(denominator == 0):
+        raise ValueError("Invalid two-voltage readings: denominator is zero.")
+    return (1.0 - voltage_ratio) / denominator
+
+
+def compute_p_pol_batch(
+    m_pos: np.ndarray,
+    m_neg: np.ndarray,
+    m_ref: np.ndarray | None = None,
+) -> np.ndarray:
+    m_pos = np.asarray(m_pos, dtype=np.float64)
+    m_neg = np.asarray(m_neg, dtype=np.float64)
+    reference = np.abs(np.asarray(m_ref, dtype=np.float64)) if m_ref is not None else np.abs(m_pos)
+    if np.any(reference <= 0):
+        raise ValueError("Reference polarity reading must be > 0.")
+    result = np.abs(m_pos)
+    result += np.abs(m_neg)
+    result /= 2.0 * reference
+    return result
+
+
+def _interpolate_by_depth(x: np.ndarray, y: np.ndarray, depth_cm: float) -> float:
+    # x must already be sorted ascending; see _build_depth_curves.
+    if depth_cm < x[0] or depth_cm > x[-1]:
         raise ValueError("Depth is outside dataset range; extrapolation is disabled.")
     return float(np.interp(depth_cm, x, y))
 
 
-def _nearest_column_value(values: pd.Series, target: float) -> float:
-    unique_values = sorted(float(value) for value in set(values.astype(float).tolist()))
-    return min(unique_values, key=lambda value: abs(value - target))
+def _nearest_column_value(unique_values: np.ndarray, target: float) -> float:
+    # unique_values is sorted ascending, so argmin resolves ties to the smaller value.
+    return float(unique_values[np.abs(unique_values - target).argmin()])
 
 
-def lookup_k_q(chamber_type: str, beam_quality: float, kq_frame: pd.DataFrame) -> float:
-    frame = kq_frame.copy()
-    frame["beam_quality"] = pd.to_numeric(frame["beam_quality"], errors="coerce")
-    frame["kq"] = pd.to_numeric(frame["kq"], errors="coerce")
-    frame = frame.dropna(subset=["beam_quality", "kq"])
-    frame = frame[frame["chamber_type"].astype(str) == str(chamber_type)]
-    if frame.empty:
-        raise ValueError(f"No kQ rows found for chamber '{chamber_type}'.")
+def _build_kq_curves(kq_frame: pd.DataFrame) -> KqCurves:
+    beam_quality = pd.to_numeric(kq_frame["beam_quality"], errors="coerce")
+    kq = pd.to_numeric(kq_frame["kq"], errors="coerce")
+    valid = beam_quality.notna() & kq.notna()
+    chambers = kq_frame["chamber_type"].astype(str)[valid]
+
+    curves: KqCurves = {}
+    for chamber_type, index in chambers.groupby(chambers, sort=False).groups.items():
+        x = beam_quality[index].to_numpy(dtype=np.float64)
+        y = kq[index].to_numpy(dtype=np.float64)
+        order = np.argsort(x, kind="stable")
+        curves[str(chamber_type)] = (x[order], y[order])
+    return curves
+
+
+def _load_kq_curves() -> KqCurves | None:
+    metadata = get_active_dataset_metadata("kq_table")
+    if metadata is None:
+        return None
+
+    cache_key = int(metadata["version"])
+    cached = _KQ_CURVES_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    metadata, frame = get_active_dataset("kq_table")
+    if metadata is None or frame is None or frame.empty:
+        return None
+    curves = _build_kq_curves(frame)
 
-    frame = frame.sort_values("beam_quality")
-    x = frame["beam_quality"].to_numpy(dtype=float)
-    y = frame["kq"].to_numpy(dtype=float)
-    if beam_quality < float(x.min()) or beam_quality > float(x.max()):
+    if len(_KQ_CURVES_CACHE) >= _LOOKUP_CACHE_MAX_ENTRIES:
+        oldest_key = next(iter(_KQ_CURVES_CACHE))
+        _KQ_CURVES_CACHE.pop(oldest_key, None)
+    _KQ_CURVES_CACHE[int(metadata["version"])] = curves
+    return curves
+
+
+def _interpolate_k_q(curves: KqCurves, chamber_type: str, beam_quality: float) -> float:
+    curve = curves.get(str(chamber_type))
+    if curve is None:
+        raise ValueError(f"No kQ rows found for chamber '{chamber_type}'.")
+    x, y = curve
+    if beam_quality < x[0] or beam_quality > x[-1]:
         raise ValueError("Beam quality is outside kQ table range.")
     return float(np.interp(beam_quality, x, y))
 
 
+def lookup_k_q(chamber_type: str, beam_quality: float, kq_frame: pd.DataFrame) -> float:
+    return _interpolate_k_q(_build_kq_curves(kq_frame), chamber_type, beam_quality)
+
+
+def _build_depth_curves(frame: pd.DataFrame) -> DepthCurves:
+    curves: DepthCurves = {}
+    for (energy, field_size), group in frame.groupby(["energy_mv", "field_size_cm"], sort=False):
+        depths = group["depth_cm"].to_numpy(dtype=np.float64)
+        values = group["value"].to_numpy(dtype=np.float64)
+        order = np.argsort(depths, kind="stable")
+        curves[(float(energy), float(field_size))] = (depths[order], values[order])
+    return curves
+
+
+def _load_depth_table(dataset_type: str) -> DepthTable | None:
+    metadata = get_active_dataset_metadata(dataset_type)
+    if metadata is None:
+        return None
+
+    # Dataset versions are immutable once registered, so the coerced table is reusable.
+    cache_key = (dataset_type, int(metadata["version"]))
+    cached = _DEPTH_TABLE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    metadata, frame = get_active_dataset(dataset_type)
+    if metadata is None or frame is None:
+        return None
+    cache_key = (dataset_type, int(metadata["version"]))
+    # get_active_dataset returns the depth columns already coerced to numeric dtypes.
+    frame = frame.dropna(subset=DEPTH_TABLE_COLUMNS)
+    energies = np.unique(frame["energy_mv"].to_numpy(dtype=np.float64))
+    fields_by_energy = {
+        float(energy): np.unique(group.to_numpy(dtype=np.float64))
+        for energy, group in frame.groupby("energy_mv", sort=False)["field_size_cm"]
+    }
+    table = (energies, fields_by_energy, _build_depth_curves(frame))
+
+    if len(_DEPTH_TABLE_CACHE) >= _LOOKUP_CACHE_MAX_ENTRIES:
+        oldest_key = next(iter(_DEPTH_TABLE_CACHE))
+        _DEPTH_TABLE_CACHE.pop(oldest_key, None)
+    _DEPTH_TABLE_CACHE[cache_key] = table
+    return table
+
+
 def lookup_depth_factor(
     geometry_mode: str,
     depth_cm: float,
@@ -130,30 +302,91 @@ def lookup_depth_factor(
     field_size_cm: float,
 ) -> float:
     dataset_type = "pdd_table" if geometry_mode == "SSD" else "tpr_table"
-    _, frame = get_active_dataset(dataset_type)
-    if frame is None or frame.empty:
+    table = _load_depth_table(dataset_type)
+    if table is None or table[0].size == 0:
         return 1.0
+    energies, fields_by_energy, curves = table
 
-    numeric_columns = ["energy_mv", "field_size_cm", "depth_cm", "value"]
-    for column in numeric_columns:
-        frame[column] = pd.to_numeric(frame[column], errors="coerce")
-    frame = frame.dropna(subset=numeric_columns)
-
-    nearest_energy = _nearest_column_value(frame["energy_mv"], energy_mv)
-    energy_slice = frame[frame["energy_mv"] == nearest_energy]
-
-    nearest_field = _nearest_column_value(energy_slice["field_size_cm"], field_size_cm)
-    table_slice = energy_slice[energy_slice["field_size_cm"] == nearest_field]
-    if table_slice.empty:
+    nearest_energy = _nearest_column_value(energies, energy_mv)
+    nearest_field = _nearest_column_value(fields_by_energy[nearest_energy], field_size_cm)
+    curve = curves.get((nearest_energy, nearest_field))
+    if curve is None:
         return 1.0
 
-    value_depth = _interpolate_by_depth(table_slice, depth_cm)
-    value_ref = _interpolate_by_depth(table_slice, d_ref_cm)
+    x, y = curve
+    value_depth = _interpolate_by_depth(x, y, depth_cm)
+    value_ref = _interpolate_by_depth(x, y, d_ref_cm)
     if value_ref == 0:
         raise ValueError("Reference depth value is zero; cannot compute depth factor.")
     return value_depth / value_ref
 
 
+def _resolve_ndw(inputs: dict[str, Any], chamber_defaults: dict) -> float:
+    ndw = (
+        float(inputs["N_Dw_60Co"])
+        if inputs.get("N_Dw_60Co") is not None
+        else float(chamber_defaults.get("ndw_60co", 0.0))
+    )
+    if ndw <= 0:
+        raise ValueError("N_Dw_60Co must be provided or available in chamber defaults.")
+    return ndw
+
+
+def _resolve_k_q(inputs: dict[str, Any], protocol_mode: str, chamber_type: str) -> float:
+    if protocol_mode == "TRS398":
+        tpr_20_10 = float(inputs.get("TPR_20_10", 0.0))
+
+        use_manual_k_q = bool(inputs.get("use_manual_k_q"))
+        use_advanced_k_q_fitting = bool(inputs.get("use_advanced_k_q_fitting"))
+
+        if use_manual_k_q:
+            return float(inputs["k_Q_manual"])
+        if use_advanced_k_q_fitting:
+            # Advanced k_Q fitting must use chamber-loaded a/b.
+            # Allow UI overrides by passing explicit kq_a/kq_b in inputs.
+            chamber_a = inputs.get("chamber_a", None)
+            chamber_b = inputs.get("chamber_b", None)
+
+            a_value = inputs.get("kq_a", None)
+            b_value = inputs.get("kq_b", None)
+
+            a = float(a_value) if a_value is not None else float(chamber_a) if chamber_a is not None else None
+            b = float(b_value) if b_value is not None else float(chamber_b) if chamber_b is not None else None
+
+            if a is None or b is None:
+                raise ValueError(
+                    "TRS-398 advanced k_Q fitting requires chamber-loaded parameters 'a' and 'b' "
+                    "(or explicit inputs 'kq_a' and 'kq_b')."
+                )
+
+            return compute_k_q_trs398(tpr_20_10, a, b)
+        raise ValueError(
+            "TRS-398 requires either manual k_Q or advanced k_Q fitting parameters."
+        )
+
+    beam_quality = float(inputs.get("beam_quality", 0.0))
+    kq_curves = _load_kq_curves()
+    if kq_curves is None:
+        raise ValueError("Active kq_table dataset is required.")
+    return (
+        float(inputs["k_Q_manual"])
+        if inputs.get("use_manual_k_q")
+        else _interpolate_k_q(kq_curves, chamber_type, beam_quality)
+    )
+
+
+def _resolve_depth_factor(inputs: dict[str, Any]) -> float:
+    if inputs.get("use_manual_depth_factor"):
+        return float(inputs["depth_factor_manual"])
+    return lookup_depth_factor(
+        geometry_mode=str(inputs.get("geometry_mode", "SSD")),
+        depth_cm=float(inputs.get("depth_cm", 10.0)),
+        d_ref_cm=float(inputs.get("d_ref_cm", 10.0)),
+        energy_mv=float(inputs.get("energy_mv", 6.0)),
+        field_size_cm=float(inputs.get("field_size_cm", 10.0)),
+    )
+
+
 def calculate_dose(inputs: dict[str, Any]) -> dict[str, Any]:
     beam_type = str(inputs["beam_type"])
     if beam_type not in {"photon", "electron"}:
@@ -226,76 +459,10 @@ def calculate_dose(inputs: dict[str, Any]) -> dict[str, Any]:
         p_elec = float(inputs.get("P_elec", 1.0))
         m_q = m_raw_c * p_tp * p_ion * p_pol * p_elec
 
-    ndw = (
-        float(inputs["N_Dw_60Co"])
-        if inputs.get("N_Dw_60Co") is not None
-        else float(chamber_defaults.get("ndw_60co", 0.0))
-    )
-    if ndw <= 0:
-        raise ValueError("N_Dw_60Co must be provided or available in chamber defaults.")
-
+    ndw = _resolve_ndw(inputs, chamber_defaults)
     geometry_mode = str(inputs.get("geometry_mode", "SSD"))
-    depth_cm = float(inputs.get("depth_cm", 10.0))
-    d_ref_cm = float(inputs.get("d_ref_cm", 10.0))
-    energy_mv = float(inputs.get("energy_mv", 6.0))
-    field_size_cm = float(inputs.get("field_size_cm", 10.0))
-
-    if protocol_mode == "TRS398":
-        tpr_20_10 = float(inputs.get("TPR_20_10", 0.0))
-
-        use_manual_k_q = bool(inputs.get("use_manual_k_q"))
-        use_advanced_k_q_fitting = bool(inputs.get("use_advanced_k_q_fitting"))
-
-        if use_manual_k_q:
-            k_q = float(inputs["k_Q_manual"])
-        elif use_advanced_k_q_fitting:
-            # Advanced k_Q fitting must use chamber-loaded a/b.
-            # Allow UI overrides by passing explicit kq_a/kq_b in inputs.
-            chamber_a = inputs.get("chamber_a", None)
-            chamber_b = inputs.get("chamber_b", None)
-
-            a_value = inputs.get("kq_a", None)
-            b_value = inputs.get("kq_b", None)
-
-            a = float(a_value) if a_value is not None else float(chamber_a) if chamber_a is not None else None
-            b = float(b_value) if b_value is not None else float(chamber_b) if chamber_b is not None else None
-
-            if a is None or b is None:
-                raise ValueError(
-                    "TRS-398 advanced k_Q fitting requires chamber-loaded parameters 'a' and 'b' "
-                    "(or explicit inputs 'kq_a' and 'kq_b')."
-                )
-
-            k_q = compute_k_q_trs398(tpr_20_10, a, b)
-        else:
-            raise ValueError(
-                "TRS-398 requires either manual k_Q or advanced k_Q fitting parameters."
-            )
-    else:
-        beam_quality = float(inputs.get("beam_quality", 0.0))
-        _, kq_frame = get_active_dataset("kq_table")
-        if kq_frame is None or kq_frame.empty:
-            raise ValueError("Active kq_table dataset is required.")
-        k_q = (
-            float(inputs["k_Q_manual"])
-            if inputs.get("use_manual_k_q")
-            else lookup_k_q(chamber_type, beam_quality, kq_frame)
-        )
-    d_ref_cm = float(inputs.get("d_ref_cm", 10.0))
-    energy_mv = float(inputs.get("energy_mv", 6.0))
-    field_size_cm = float(inputs.get("field_size_cm", 10.0))
-
-    depth_factor = (
-        float(inputs["depth_factor_manual"])
-        if inputs.get("use_manual_depth_factor")
-        else lookup_depth_factor(
-            geometry_mode=geometry_mode,
-            depth_cm=depth_cm,
-            d_ref_cm=d_ref_cm,
-            energy_mv=energy_mv,
-            field_size_cm=field_size_cm,
-        )
-    )
+    k_q = _resolve_k_q(inputs, protocol_mode, chamber_type)
+    depth_factor = _resolve_depth_factor(inputs)
 
     formula = get_active_formula(beam_type)
     if not formula:
@@ -359,3 +526,139 @@ def calculate_dose(inputs: dict[str, Any]) -> dict[str, Any]:
         },
     }
 
+
+def _measurement_column(
+    measurements: pd.DataFrame,
+    inputs: dict[str, Any],
+    column: str,
+    fallback: np.ndarray | float | None = None,
+) -> np.ndarray | None:
+    if column in measurements.columns:
+        return measurements[column].to_numpy(dtype=np.float64)
+    value = inputs.get(column)
+    if value is None:
+        value = fallback
+    if value is None:
+        return None
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (len(measurements),))
+
+
+def calculate_dose_batch(inputs: dict[str, Any], measurements: pd.DataFrame) -> dict[str, Any]:
+    """
+    Evaluates many measurements that share one setup (beam, chamber, geometry,
+    protocol). Each column in BATCH_MEASUREMENT_COLUMNS present in
+    `measurements` overrides the scalar value from `inputs` row by row.
+    """
+    beam_type = str(inputs["beam_type"])
+    if beam_type not in {"photon", "electron"}:
+        raise ValueError("beam_type must be photon or electron.")
+    if measurements.empty:
+        raise ValueError("Batch measurements cannot be empty.")
+
+    chamber_type = str(inputs["chamber_type"])
+    chamber_defaults = get_chamber_defaults(chamber_type) or {}
+
+    m_raw = _measurement_column(measurements, inputs, "M_raw")
+    mu_meas = _measurement_column(measurements, inputs, "MU_meas")
+    if m_raw is None or mu_meas is None:
+        raise ValueError("Batch measurements require M_raw and MU_meas.")
+    reading_unit = str(inputs.get("reading_unit", "nC"))
+    m_raw_c = to_coulomb(m_raw, reading_unit)
+
+    protocol_mode = str(inputs.get("protocol_mode", "TG51"))
+    t_meas = _measurement_column(measurements, inputs, "T_meas_C", DEFAULT_T0_C)
+    p_meas = _measurement_column(measurements, inputs, "P_meas_kPa", DEFAULT_P0_KPA)
+    t0 = float(inputs.get("T0_C", DEFAULT_T0_C))
+    p0 = float(inputs.get("P0_kPa", DEFAULT_P0_KPA))
+
+    if inputs.get("use_manual_p_tp"):
+        p_tp = np.full(len(measurements), float(inputs["P_TP_manual"]))
+    elif protocol_mode == "TRS398":
+        p_tp = compute_k_tp_trs398_batch(t_meas, p_meas, t0_c=t0, p0_kpa=p0)
+    else:
+        p_tp = compute_p_tp_batch(t_meas, p_meas, t0_c=t0, p0_kpa=p0)
+
+    if inputs.get("use_manual_p_ion"):
+        p_ion = np.full(len(measurements), float(inputs["P_ion_manual"]))
+    else:
+        two_voltage = [
+            _measurement_column(measurements, inputs, column)
+            for column in ("M_high", "M_low", "V_high", "V_low")
+        ]
+        if any(values is None for values in two_voltage):
+            raise ValueError("Batch measurements require M_high, M_low, V_high, and V_low.")
+        p_ion = compute_p_ion_two_voltage_batch(*two_voltage)
+
+    if inputs.get("use_manual_p_pol"):
+        p_pol = np.full(len(measurements), float(inputs["P_pol_manual"]))
+    else:
+        m_pos = _measurement_column(measurements, inputs, "M_pos", m_raw)
+        m_neg = _measurement_column(measurements, inputs, "M_neg", m_raw)
+        m_ref = _measurement_column(measurements, inputs, "M_ref")
+        p_pol = compute_p_pol_batch(m_pos, m_neg, m_ref)
+
+    p_elec = float(inputs.get("P_elec", 1.0))
+    m_q = m_raw_c * p_tp * p_ion * p_pol * p_elec
+
+    ndw = _resolve_ndw(inputs, chamber_defaults)
+    geometry_mode = str(inputs.get("geometry_mode", "SSD"))
+    k_q = _resolve_k_q(inputs, protocol_mode, chamber_type)
+    depth_factor = _resolve_depth_factor(inputs)
+
+    formula = get_active_formula(beam_type)
+    if not formula:
+        raise ValueError(f"No active formula for beam type '{beam_type}'.")
+
+    shared_variables = {
+        "P_elec": p_elec,
+        "N_Dw_60Co": ndw,
+        "k_Q": k_q,
+        "depth_factor": depth_factor,
+        "k_ecal": float(inputs.get("k_ecal", 1.0)),
+        "k_R50": float(inputs.get("k_R50", 1.0)),
+        "P_Q_gr": float(inputs.get("P_Q_gr", 1.0)),
+    }
+    variables = dict(shared_variables)
+    variables.update(
+        {
+            "M_raw_C": m_raw_c,
+            "M_Q": m_q,
+            "P_TP": p_tp,
+            "P_ion": p_ion,
+            "P_pol": p_pol,
+            "MU_meas": mu_meas,
+        }
+    )
+    dose_per_measurement = safe_eval_formula_batch(formula["expression"], variables, len(measurements))
+    dose_per_100mu = dose_per_measurement * (100.0 / mu_meas)
+
+    factor_names = ("k_TP", "k_s", "k_pol") if protocol_mode == "TRS398" else ("P_TP", "P_ion", "P_pol")
+    results = pd.DataFrame(
+        {
+            "M_raw_C": m_raw_c,
+            "M_Q": m_q,
+            factor_names[0]: p_tp,
+            factor_names[1]: p_ion,
+            factor_names[2]: p_pol,
+            "dose_per_measurement_gy": dose_per_measurement,
+            "dose_per_100mu_gy": dose_per_100mu,
+        },
+        index=measurements.index,
+    )
+
+    return {
+        "beam_type": beam_type,
+        "geometry_mode": geometry_mode,
+        "protocol_mode": protocol_mode,
+        "formula_name": formula["name"],
+        "formula_version": int(formula["version"]),
+        "formula_expression": formula["expression"],
+        "dataset_versions": get_active_dataset_versions(),
+        "shared": {
+            "P_elec": p_elec,
+            "N_Dw_60Co": ndw,
+            "k_Q": k_q,
+            "depth_factor": depth_factor,
+        },
+        "results": results,
+    }
@@ -1,16 +1,36 @@
 import json
 import sqlite3
 from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
+from threading import RLock
 from typing import Any
 
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional runtime dependency
+    orjson = None
+
 from dosimetry_app.config import DB_PATH
 
+# Large enough to keep every distinct statement the app issues prepared on the shared connection.
+STATEMENT_CACHE_SIZE = 256
 
-@contextmanager
-def get_connection():
+_CONNECTION_LOCK = RLock()
+_CONNECTION: sqlite3.Connection | None = None
+_CONNECTION_PATH: str | None = None
+_CONNECTION_DEPTH = 0
+
+
+def _open_connection() -> sqlite3.Connection:
     Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=10,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
     conn.execute("PRAGMA busy_timeout = 5000;")
@@ -20,11 +40,64 @@ def get_connection():
     except sqlite3.DatabaseError:
         # Keep defaults when WAL mode is unavailable on the host filesystem.
         pass
-    try:
+    return conn
+
+
+def _shared_connection() -> sqlite3.Connection:
+    global _CONNECTION, _CONNECTION_PATH
+
+    db_path = str(DB_PATH)
+    if _CONNECTION is None or _CONNECTION_PATH != db_path:
+        if _CONNECTION is not None:
+            _CONNECTION.close()
+        _CONNECTION = _open_connection()
+        _CONNECTION_PATH = db_path
+    return _CONNECTION
+
+
+def close_connection() -> None:
+    global _CONNECTION, _CONNECTION_PATH
+
+    with _CONNECTION_LOCK:
+        if _CONNECTION is not None:
+            _CONNECTION.close()
+        _CONNECTION = None
+        _CONNECTION_PATH = None
+
+
+@contextmanager
+def get_connection():
+    # One process-wide connection serialized by a re-entrant lock; only the
+    # outermost caller commits or rolls back so nested helpers share its transaction.
+    global _CONNECTION_DEPTH
+
+    with _CONNECTION_LOCK:
+        conn = _shared_connection()
+        _CONNECTION_DEPTH += 1
+        try:
+            yield conn
+            if _CONNECTION_DEPTH == 1:
+                conn.commit()
+        except BaseException:
+            if _CONNECTION_DEPTH == 1:
+                conn.rollback()
+            raise
+        finally:
+            _CONNECTION_DEPTH -= 1
+
+
+def in_transaction() -> bool:
+    # True while a caller holds uncommitted writes on the shared connection, so reads may still roll back.
+    return _CONNECTION is not None and _CONNECTION.in_transaction
+
+
+@contextmanager
+def transaction():
+    # Groups every nested get_connection() call into one write transaction and one commit.
+    with get_connection() as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
         yield conn
-        conn.commit()
-    finally:
-        conn.close()
 
 
 def init_db() -> None:
@@ -54,8 +127,9 @@ def init_db() -> None:
                 UNIQUE(dataset_type, version)
             );
 
-            CREATE INDEX IF NOT EXISTS idx_datasets_type_status
-            ON datasets(dataset_type, status);
+            DROP INDEX IF EXISTS idx_datasets_type_status;
+            CREATE INDEX IF NOT EXISTS idx_datasets_type_status_version
+            ON datasets(dataset_type, status, version);
 
             CREATE TABLE IF NOT EXISTS formulas (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -73,8 +147,9 @@ def init_db() -> None:
                 UNIQUE(name, beam_type, version)
             );
 
-            CREATE INDEX IF NOT EXISTS idx_formulas_beam_status
-            ON formulas(beam_type, status);
+            DROP INDEX IF EXISTS idx_formulas_beam_status;
+            CREATE INDEX IF NOT EXISTS idx_formulas_beam_status_created
+            ON formulas(beam_type, status, created_at);
 
             CREATE TABLE IF NOT EXISTS calculator_runs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -90,6 +165,9 @@ def init_db() -> None:
                 FOREIGN KEY(user_id) REFERENCES users(id)
             );
 
+            CREATE INDEX IF NOT EXISTS idx_calculator_runs_ts
+            ON calculator_runs(run_ts);
+
             CREATE TABLE IF NOT EXISTS app_settings (
                 key TEXT PRIMARY KEY,
                 value TEXT NOT NULL,
@@ -106,28 +184,52 @@ def execute(sql: str, params: tuple[Any, ...] = ()) -> int:
 
 
 def execute_transaction(commands: list[tuple[str, tuple[Any, ...]]]) -> None:
+    # Consecutive commands sharing the same SQL are sent as one executemany batch.
     with get_connection() as conn:
-        for sql, params in commands:
-            conn.execute(sql, params)
+        for sql, group in groupby(commands, key=itemgetter(0)):
+            conn.executemany(sql, [params for _, params in group])
 
 
-def query_one(sql: str, params: tuple[Any, ...] = ()) -> dict[str, Any] | None:
+def query_row(sql: str, params: tuple[Any, ...] = ()) -> sqlite3.Row | None:
+    # Read-only variant of query_one: hands back the sqlite3.Row without copying it into a dict.
     with get_connection() as conn:
-        row = conn.execute(sql, params).fetchone()
-        return dict(row) if row else None
+        return conn.execute(sql, params).fetchone()
 
 
-def query_all(sql: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
+def query_rows(sql: str, params: tuple[Any, ...] = ()) -> list[sqlite3.Row]:
+    # Read-only variant of query_all for callers that only index rows by column name.
     with get_connection() as conn:
-        rows = conn.execute(sql, params).fetchall()
-        return [dict(row) for row in rows]
+        return conn.execute(sql, params).fetchall()
+
+
+def query_one(sql: str, params: tuple[Any, ...] = ()) -> dict[str, Any] | None:
+    row = query_row(sql, params)
+    return dict(row) if row else None
+
+
+def query_all(sql: str, params: tuple[Any, ...] = ()) -> list[dict[str, Any]]:
+    return [dict(row) for row in query_rows(sql, params)]
 
 
 def dump_json(data: Any) -> str:
+    # orjson writes NaN/Infinity as null, so stored payloads stay strict JSON that SQLite's json_extract accepts;
+    # non-finite values therefore read back as None.
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+        except TypeError:
+            # Fall through so unsupported values fail (or serialize) exactly as before.
+            pass
     return json.dumps(data, ensure_ascii=True)
 
 
 def load_json(raw: str | None, default: Any) -> Any:
     if not raw:
         return default
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # Rows written by the stdlib encoder may contain NaN/Infinity literals.
+            pass
     return json.loads(raw)
@@ -2,72 +2,167 @@ from __future__ import annotations
 
 import hashlib
 import re
+from io import BytesIO, RawIOBase
 from datetime import datetime, timezone
 from difflib import get_close_matches
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow  # noqa: F401
+except Exception:  # pragma: no cover - optional runtime dependency
+    pyarrow = None
+
+try:
+    import python_calamine  # noqa: F401
+except Exception:  # pragma: no cover - optional runtime dependency
+    python_calamine = None
+
 from dosimetry_app.config import SEED_DIR, SUPPORTED_DATASET_TYPES, UPLOAD_DIR
-from dosimetry_app.database import dump_json, execute, execute_transaction, query_all, query_one
-from dosimetry_app.validators import validate_dataset
+from dosimetry_app.database import dump_json, execute, execute_transaction, query_all, query_one, query_row, query_rows
+from dosimetry_app.validators import NUMERIC_COLUMNS, validate_dataset
 
 DEFAULT_AFRICA_LOCATION = "Harare, Zimbabwe"
 _DATAFRAME_CACHE_MAX_ENTRIES = 32
-_DATAFRAME_CACHE: dict[str, tuple[int, pd.DataFrame]] = {}
+CSV_WRITE_CHUNK_ROWS = 65536
+_DATAFRAME_CACHE: dict[str, tuple[str, pd.DataFrame]] = {}
+_LISTING_CACHE: dict[tuple[str, str, str], tuple[str, ...]] = {}
+_CHAMBER_DEFAULTS_CACHE: dict[tuple[str, str, str], dict | None] = {}
+
+
+class _LocationIndex(NamedTuple):
+    locations: np.ndarray
+    normalized: np.ndarray
+    folded_positions: dict[str, int]
+    normalized_positions: dict[str, int]
+
+
+_LOCATION_INDEX_CACHE: dict[tuple[str, str], _LocationIndex] = {}
+
+
+_LOCATION_SEPARATOR_PATTERN = re.compile(r"[^a-z0-9]+")
 
 
 def _normalize_location_name(value: str) -> str:
-    normalized = re.sub(r"[^a-z0-9]+", " ", str(value).strip().lower())
+    normalized = _LOCATION_SEPARATOR_PATTERN.sub(" ", str(value).strip().lower())
     return " ".join(normalized.split())
 
 
+def _normalize_location_series(values: pd.Series) -> pd.Series:
+    # Vectorized _normalize_location_name: separator runs collapse to one space, so strip() finishes it.
+    return (
+        values.astype(str)
+        .str.strip()
+        .str.lower()
+        .str.replace(_LOCATION_SEPARATOR_PATTERN, " ", regex=True)
+        .str.strip()
+    )
+
+
 def _read_file_to_dataframe(file_name: str, raw_bytes: bytes) -> pd.DataFrame:
     suffix = Path(file_name).suffix.lower()
     if suffix == ".csv":
-        return pd.read_csv(pd.io.common.BytesIO(raw_bytes))
+        return pd.read_csv(BytesIO(raw_bytes))
     if suffix in {".xlsx", ".xls"}:
-        return pd.read_excel(pd.io.common.BytesIO(raw_bytes))
+        # calamine parses workbooks natively; without it pandas uses openpyxl (read-only) or xlrd.
+        engine = "calamine" if python_calamine is not None else None
+        return pd.read_excel(BytesIO(raw_bytes), engine=engine)
     raise ValueError("Only CSV and XLSX/XLS files are supported.")
 
 
 def _next_dataset_version(dataset_type: str) -> int:
-    row = query_one(
+    row = query_row(
         """
-        SELECT COALESCE(MAX(version), 0) AS max_version
+        SELECT version
         FROM datasets
         WHERE dataset_type = ?
+        ORDER BY version DESC
+        LIMIT 1
         """,
         (dataset_type,),
     )
-    return int(row["max_version"]) + 1 if row else 1
+    return int(row["version"]) + 1 if row else 1
+
+
+class _HashingWriter(RawIOBase):
+    # Hashes bytes on their way to disk so the written CSV never has to be read back.
+    def __init__(self, handle, digest) -> None:
+        self._handle = handle
+        self._digest = digest
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._digest.update(data)
+        return self._handle.write(data)
 
 
 def _persist_csv(frame: pd.DataFrame, dataset_type: str, version: int) -> tuple[str, str]:
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
     file_name = f"{dataset_type}_v{version}_{timestamp}.csv"
     target = UPLOAD_DIR / file_name
-    frame.to_csv(target, index=False)
-    checksum = hashlib.sha256(target.read_bytes()).hexdigest()
-    return str(target), checksum
+    digest = hashlib.sha256()
+    with target.open("wb") as handle:
+        frame.to_csv(_HashingWriter(handle, digest), index=False, chunksize=CSV_WRITE_CHUNK_ROWS)
+    return str(target), digest.hexdigest()
+
 
+def _parquet_sidecar_path(file_path: str) -> Path:
+    return Path(file_path).with_suffix(".parquet")
 
-def _read_csv_cached(file_path: str) -> pd.DataFrame:
-    path = Path(file_path)
-    resolved_path = str(path.resolve())
-    modified_ns = path.stat().st_mtime_ns
 
-    cached = _DATAFRAME_CACHE.get(resolved_path)
-    if cached and cached[0] == modified_ns:
-        return cached[1].copy()
+def _read_parquet_sidecar(file_path: str) -> pd.DataFrame | None:
+    if pyarrow is None:
+        return None
+    sidecar = _parquet_sidecar_path(file_path)
+    if not sidecar.exists():
+        return None
+    try:
+        frame = pd.read_parquet(sidecar)
+    except Exception:
+        return None
+    # Parquet stores missing text as None; the CSV parser yields NaN, which callers expect.
+    return frame.fillna(np.nan)
 
-    frame = pd.read_csv(path)
+
+def _write_parquet_sidecar(file_path: str, frame: pd.DataFrame) -> None:
+    # The CSV stays the source of truth; the sidecar only skips text parsing on later loads.
+    if pyarrow is None:
+        return
+    try:
+        frame.to_parquet(_parquet_sidecar_path(file_path), index=False, compression="snappy")
+    except Exception:
+        return
+
+
+def _read_csv_cached(
+    file_path: str,
+    checksum: str,
+    numeric_columns: tuple[str, ...] | list[str] = (),
+) -> pd.DataFrame:
+    # Uploaded files are never rewritten, so the stored checksum identifies the parsed frame.
+    cached = _DATAFRAME_CACHE.get(file_path)
+    if cached and cached[0] == checksum:
+        return cached[1].copy(deep=False)
+
+    frame = _read_parquet_sidecar(file_path)
+    if frame is None:
+        frame = pd.read_csv(file_path, memory_map=True)
+        # Coerce once at parse time so cached frames already carry numeric dtypes for lookups.
+        for column in numeric_columns:
+            if column in frame.columns and not pd.api.types.is_numeric_dtype(frame[column]):
+                frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        _write_parquet_sidecar(file_path, frame)
+    _DATAFRAME_CACHE.pop(file_path, None)
     if len(_DATAFRAME_CACHE) >= _DATAFRAME_CACHE_MAX_ENTRIES:
         oldest_key = next(iter(_DATAFRAME_CACHE))
         _DATAFRAME_CACHE.pop(oldest_key, None)
-    _DATAFRAME_CACHE[resolved_path] = (modified_ns, frame)
-    return frame.copy()
+    _DATAFRAME_CACHE[file_path] = (checksum, frame)
+    return frame.copy(deep=False)
 
 
 def _register_dataset(
@@ -133,32 +228,37 @@ def import_dataset_from_path(
     notes: str | None = "Seed dataset",
     activate: bool = True,
 ) -> tuple[int, list[str]]:
-    frame = pd.read_csv(file_path)
+    frame = pd.read_csv(file_path, memory_map=True)
     return _register_dataset(dataset_type, frame, uploaded_by, notes=notes, activate=activate)
 
 
 def list_datasets(dataset_type: str | None = None) -> list[dict]:
-    if dataset_type:
-        return query_all(
-            """
-            SELECT *
-            FROM datasets
-            WHERE dataset_type = ?
-            ORDER BY dataset_type, version DESC
-            """,
-            (dataset_type,),
-        )
+    # One statement for both the filtered and unfiltered listing keeps a single prepared statement hot.
     return query_all(
         """
         SELECT *
         FROM datasets
+        WHERE (? IS NULL OR dataset_type = ?)
+        ORDER BY dataset_type, version DESC
+        """,
+        (dataset_type or None, dataset_type or None),
+    )
+
+
+def list_eligible_datasets() -> list[dict]:
+    # Activation candidates only need their label columns, so the filter and projection stay in SQL.
+    return query_all(
+        """
+        SELECT id, dataset_type, version
+        FROM datasets
+        WHERE validation_status = 'passed' AND status != 'active'
         ORDER BY dataset_type, version DESC
         """
     )
 
 
 def activate_dataset(dataset_id: int) -> None:
-    dataset = query_one("SELECT * FROM datasets WHERE id = ?", (dataset_id,))
+    dataset = query_row("SELECT * FROM datasets WHERE id = ?", (dataset_id,))
     if not dataset:
         raise ValueError("Dataset not found.")
     if dataset["validation_status"] != "passed":
@@ -175,8 +275,8 @@ def activate_dataset(dataset_id: int) -> None:
     )
 
 
-def get_active_dataset(dataset_type: str) -> tuple[dict | None, pd.DataFrame | None]:
-    metadata = query_one(
+def get_active_dataset_metadata(dataset_type: str) -> dict | None:
+    return query_one(
         """
         SELECT *
         FROM datasets
@@ -186,15 +286,34 @@ def get_active_dataset(dataset_type: str) -> tuple[dict | None, pd.DataFrame | N
         """,
         (dataset_type,),
     )
+
+
+def get_active_dataset(dataset_type: str) -> tuple[dict | None, pd.DataFrame | None]:
+    metadata = get_active_dataset_metadata(dataset_type)
     if not metadata:
         return None, None
-    frame = _read_csv_cached(metadata["file_path"])
+    frame = _read_csv_cached(
+        metadata["file_path"],
+        str(metadata.get("checksum") or ""),
+        NUMERIC_COLUMNS.get(dataset_type, ()),
+    )
     return metadata, frame
 
 
+def load_dataset_frame(dataset_id: int) -> pd.DataFrame | None:
+    metadata = query_one("SELECT * FROM datasets WHERE id = ?", (dataset_id,))
+    if not metadata:
+        return None
+    return _read_csv_cached(
+        metadata["file_path"],
+        str(metadata.get("checksum") or ""),
+        NUMERIC_COLUMNS.get(metadata["dataset_type"], ()),
+    )
+
+
 def get_active_dataset_versions() -> dict[str, int]:
     versions: dict[str, int] = {}
-    rows = query_all(
+    rows = query_rows(
         """
         SELECT dataset_type, version
         FROM datasets
@@ -210,12 +329,43 @@ def get_supported_dataset_types() -> tuple[str, ...]:
     return SUPPORTED_DATASET_TYPES
 
 
-def list_available_chambers() -> list[str]:
-    _, frame = get_active_dataset("chamber_defaults")
-    if frame is None or frame.empty:
+def _read_active_columns(metadata: dict, columns: list[str]) -> pd.DataFrame:
+    # Narrow consumers reuse the full cached frame when it is warm; otherwise only their columns are parsed.
+    file_path = str(metadata["file_path"])
+    cached = _DATAFRAME_CACHE.get(file_path)
+    if cached and cached[0] == str(metadata.get("checksum") or ""):
+        return cached[1][columns]
+
+    if pyarrow is not None:
+        sidecar = _parquet_sidecar_path(file_path)
+        if sidecar.exists():
+            try:
+                return pd.read_parquet(sidecar, columns=columns).fillna(np.nan)
+            except Exception:
+                pass
+    return pd.read_csv(file_path, usecols=columns, memory_map=True)
+
+
+def _cached_listing(dataset_type: str, column: str, build) -> list[str]:
+    # Sorted option lists only change when a new dataset version is activated.
+    metadata = get_active_dataset_metadata(dataset_type)
+    if not metadata:
         return []
-    values = frame["chamber_type"].astype(str).str.strip().tolist()
-    return sorted(set(values))
+    cache_key = (str(metadata["file_path"]), str(metadata.get("checksum") or ""), column)
+    cached = _LISTING_CACHE.get(cache_key)
+    if cached is None:
+        frame = _read_active_columns(metadata, [column])
+        values = [] if frame.empty else frame[column].astype(str).str.strip().tolist()
+        cached = tuple(build(values))
+        if len(_LISTING_CACHE) >= _DATAFRAME_CACHE_MAX_ENTRIES:
+            oldest_key = next(iter(_LISTING_CACHE))
+            _LISTING_CACHE.pop(oldest_key, None)
+        _LISTING_CACHE[cache_key] = cached
+    return list(cached)
+
+
+def list_available_chambers() -> list[str]:
+    return _cached_listing("chamber_defaults", "chamber_type", lambda values: sorted(set(values)))
 
 
 def get_chamber_defaults(chamber_type: str) -> dict | None:
@@ -224,8 +374,30 @@ def get_chamber_defaults(chamber_type: str) -> dict | None:
     Table 45 parameters if they are present in the active dataset:
       - a, b, r_cav (rcav_cm alias), type, f_ch_60co
     """
-    _, frame = get_active_dataset("chamber_defaults")
-    if frame is None or frame.empty:
+    metadata = get_active_dataset_metadata("chamber_defaults")
+    if not metadata:
+        return None
+    # The Calculator asks for the same chamber several times per rerun; rows only change with a new version.
+    cache_key = (str(metadata["file_path"]), str(metadata.get("checksum") or ""), chamber_type)
+    if cache_key in _CHAMBER_DEFAULTS_CACHE:
+        cached = _CHAMBER_DEFAULTS_CACHE[cache_key]
+        return dict(cached) if cached is not None else None
+
+    result = _build_chamber_defaults(metadata, chamber_type)
+    if len(_CHAMBER_DEFAULTS_CACHE) >= _DATAFRAME_CACHE_MAX_ENTRIES:
+        oldest_key = next(iter(_CHAMBER_DEFAULTS_CACHE))
+        _CHAMBER_DEFAULTS_CACHE.pop(oldest_key, None)
+    _CHAMBER_DEFAULTS_CACHE[cache_key] = result
+    return dict(result) if result is not None else None
+
+
+def _build_chamber_defaults(metadata: dict, chamber_type: str) -> dict | None:
+    frame = _read_csv_cached(
+        metadata["file_path"],
+        str(metadata.get("checksum") or ""),
+        NUMERIC_COLUMNS["chamber_defaults"],
+    )
+    if frame.empty:
         return None
 
     matched = frame[frame["chamber_type"].astype(str) == chamber_type]
@@ -263,11 +435,7 @@ def get_chamber_defaults(chamber_type: str) -> dict | None:
     return result
 
 
-def list_environment_locations() -> list[str]:
-    _, frame = get_active_dataset("environmental_data")
-    if frame is None or frame.empty:
-        return []
-    values = frame["location"].astype(str).str.strip().tolist()
+def _order_environment_locations(values: list[str]) -> list[str]:
     unique = sorted(set(value for value in values if value), key=lambda value: value.lower())
 
     harare_match = [value for value in unique if _normalize_location_name(value) == _normalize_location_name(DEFAULT_AFRICA_LOCATION)]
@@ -277,57 +445,80 @@ def list_environment_locations() -> list[str]:
     return unique
 
 
+def list_environment_locations() -> list[str]:
+    return _cached_listing("environmental_data", "location", _order_environment_locations)
+
+
+def _first_positions(values: np.ndarray) -> dict[str, int]:
+    positions: dict[str, int] = {}
+    for position, value in enumerate(values.tolist()):
+        positions.setdefault(value, position)
+    return positions
+
+
+def _location_index(metadata: dict, frame: pd.DataFrame) -> _LocationIndex:
+    # Derived lookup columns are built once per dataset version instead of on a per-call frame copy.
+    cache_key = (str(metadata["file_path"]), str(metadata.get("checksum") or ""))
+    cached = _LOCATION_INDEX_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    locations = frame["location"].astype(str).str.strip()
+    normalized = _normalize_location_series(locations).to_numpy(dtype=str)
+    # Exact and normalized matches resolve through dicts of first positions; only the substring pass scans.
+    index = _LocationIndex(
+        locations=locations.to_numpy(dtype=str),
+        normalized=normalized,
+        folded_positions=_first_positions(locations.str.casefold().to_numpy(dtype=str)),
+        normalized_positions=_first_positions(normalized),
+    )
+    if len(_LOCATION_INDEX_CACHE) >= _DATAFRAME_CACHE_MAX_ENTRIES:
+        oldest_key = next(iter(_LOCATION_INDEX_CACHE))
+        _LOCATION_INDEX_CACHE.pop(oldest_key, None)
+    _LOCATION_INDEX_CACHE[cache_key] = index
+    return index
+
+
 def get_environment_from_dataset(location: str | None = None) -> dict | None:
-    _, frame = get_active_dataset("environmental_data")
-    if frame is None or frame.empty:
+    metadata, frame = get_active_dataset("environmental_data")
+    if metadata is None or frame is None or frame.empty:
         return None
 
-    frame = frame.copy()
-    frame["location"] = frame["location"].astype(str).str.strip()
-    frame["_normalized_location"] = frame["location"].map(_normalize_location_name)
+    index = _location_index(metadata, frame)
+    locations, normalized = index.locations, index.normalized
+    folded_positions, normalized_positions = index.folded_positions, index.normalized_positions
 
-    selected = None
+    position = None
     if location:
         input_name = str(location).strip()
         input_normalized = _normalize_location_name(input_name)
 
-        exact = frame[frame["location"].str.casefold() == input_name.casefold()]
-        if not exact.empty:
-            selected = exact.iloc[0]
-
-        if selected is None:
-            normalized_exact = frame[frame["_normalized_location"] == input_normalized]
-            if not normalized_exact.empty:
-                selected = normalized_exact.iloc[0]
-
-        if selected is None:
-            partial = frame[frame["_normalized_location"].str.contains(input_normalized, na=False)]
-            if not partial.empty:
-                selected = partial.iloc[0]
-
-        if selected is None:
-            candidates = frame["_normalized_location"].dropna().tolist()
-            best = get_close_matches(input_normalized, candidates, n=1, cutoff=0.72)
+        position = folded_positions.get(input_name.casefold())
+        if position is None:
+            position = normalized_positions.get(input_normalized)
+        if position is None:
+            matches = np.flatnonzero(np.char.find(normalized, input_normalized) >= 0)
+            if matches.size:
+                position = int(matches[0])
+        if position is None:
+            # normalized_positions holds each distinct name once, in first-seen order, for fuzzy scoring.
+            best = get_close_matches(input_normalized, list(normalized_positions), n=1, cutoff=0.72)
             if best:
-                matched = frame[frame["_normalized_location"] == best[0]]
-                if not matched.empty:
-                    selected = matched.iloc[0]
+                position = normalized_positions[best[0]]
 
-        if selected is None:
+        if position is None:
             available = ", ".join(list_environment_locations()[:12])
             raise ValueError(
                 f"Location '{location}' not found in active environmental_data dataset. "
                 f"Available examples: {available}"
             )
 
-    if selected is None:
-        default_match = frame[
-            frame["_normalized_location"] == _normalize_location_name(DEFAULT_AFRICA_LOCATION)
-        ]
-        selected = default_match.iloc[0] if not default_match.empty else frame.iloc[0]
+    if position is None:
+        position = normalized_positions.get(_normalize_location_name(DEFAULT_AFRICA_LOCATION), 0)
 
+    selected = frame.iloc[position]
     result = {
-        "location": str(selected["location"]),
+        "location": str(locations[position]),
         "temperature_c": float(selected["temperature_c"]),
         "pressure_kpa": float(selected["pressure_kpa"]),
     }
@@ -354,14 +545,11 @@ def ensure_africa_environment_dataset() -> None:
         )
         return
 
-    has_harare = not frame[
-        frame["location"].astype(str).map(_normalize_location_name)
-        == _normalize_location_name(DEFAULT_AFRICA_LOCATION)
-    ].empty
-    if has_harare:
+    # Only system-seeded datasets are ever refreshed, so user uploads skip the Harare scan entirely.
+    if str(metadata.get("uploaded_by", "")) != "system":
         return
 
-    if str(metadata.get("uploaded_by", "")) != "system":
+    if _normalize_location_name(DEFAULT_AFRICA_LOCATION) in _location_index(metadata, frame).normalized_positions:
         return
 
     import_dataset_from_path(
@@ -374,12 +562,9 @@ def ensure_africa_environment_dataset() -> None:
 
 
 def seed_builtin_datasets() -> None:
+    seeded_types = {str(row["dataset_type"]) for row in query_rows("SELECT DISTINCT dataset_type FROM datasets")}
     for dataset_type in SUPPORTED_DATASET_TYPES:
-        existing = query_one(
-            "SELECT id FROM datasets WHERE dataset_type = ? LIMIT 1",
-            (dataset_type,),
-        )
-        if existing:
+        if dataset_type in seeded_types:
             continue
 
         seed_file = SEED_DIR / f"{dataset_type}.csv"
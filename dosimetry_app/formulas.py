@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 import ast
+from functools import reduce
+from types import CodeType
 from typing import Any
 
-from dosimetry_app.database import dump_json, execute, execute_transaction, load_json, query_all, query_one
+import numpy as np
+
+from dosimetry_app.database import dump_json, execute, execute_transaction, load_json, query_all, query_one, query_row, query_rows
+
+_ACTIVE_FORMULA_CACHE_MAX_ENTRIES = 16
+_ACTIVE_FORMULA_CACHE: dict[int, dict] = {}
+_COMPILED_FORMULA_CACHE_MAX_ENTRIES = 64
+_COMPILED_FORMULA_CACHE: dict[str, tuple[CodeType, tuple[str, ...]]] = {}
 
 ALLOWED_FUNCTIONS = {
     "abs": abs,
@@ -12,6 +21,15 @@ ALLOWED_FUNCTIONS = {
     "round": round,
 }
 
+_FORMULA_GLOBALS = {"__builtins__": {}, **ALLOWED_FUNCTIONS}
+_VECTOR_FORMULA_GLOBALS = {
+    "__builtins__": {},
+    "abs": np.abs,
+    "min": lambda *args: reduce(np.minimum, args),
+    "max": lambda *args: reduce(np.maximum, args),
+    "round": np.round,
+}
+
 ALLOWED_NODES = (
     ast.Expression,
     ast.BinOp,
@@ -75,8 +93,9 @@ def validate_formula_expression(expression: str, variables: list[str]) -> list[s
     return sorted(set(errors))
 
 
-def safe_eval_formula(expression: str, values: dict[str, Any]) -> float:
+def _compile_formula(expression: str, values: dict[str, Any]) -> tuple[CodeType, tuple[str, ...]]:
     parsed = ast.parse(expression, mode="eval")
+    names: list[str] = []
     for node in ast.walk(parsed):
         if not isinstance(node, ALLOWED_NODES):
             raise ValueError(f"Unsupported expression node: {type(node).__name__}")
@@ -88,15 +107,46 @@ def safe_eval_formula(expression: str, values: dict[str, Any]) -> float:
         if isinstance(node, ast.Name):
             if node.id not in values and node.id not in ALLOWED_FUNCTIONS:
                 raise ValueError(f"Missing formula variable: {node.id}")
+            names.append(node.id)
+    return compile(parsed, "<formula>", "eval"), tuple(dict.fromkeys(names))
+
+
+def _compiled_formula(expression: str, values: dict[str, Any]) -> CodeType:
+    # Only expressions that passed the AST safety walk are cached, so a hit just checks names.
+    cached = _COMPILED_FORMULA_CACHE.get(expression)
+    if cached is None:
+        cached = _compile_formula(expression, values)
+        if len(_COMPILED_FORMULA_CACHE) >= _COMPILED_FORMULA_CACHE_MAX_ENTRIES:
+            oldest_key = next(iter(_COMPILED_FORMULA_CACHE))
+            _COMPILED_FORMULA_CACHE.pop(oldest_key, None)
+        _COMPILED_FORMULA_CACHE[expression] = cached
+    else:
+        for name in cached[1]:
+            if name not in values and name not in ALLOWED_FUNCTIONS:
+                raise ValueError(f"Missing formula variable: {name}")
+    return cached[0]
 
-    scope = dict(ALLOWED_FUNCTIONS)
-    scope.update(values)
-    result = eval(compile(parsed, "<formula>", "eval"), {"__builtins__": {}}, scope)  # noqa: S307
+
+def safe_eval_formula(expression: str, values: dict[str, Any]) -> float:
+    code = _compiled_formula(expression, values)
+    # Variables resolve as locals ahead of the allowed functions, so values are never copied.
+    result = eval(code, _FORMULA_GLOBALS, values)  # noqa: S307
     return float(result)
 
 
+def safe_eval_formula_batch(expression: str, values: dict[str, Any], size: int) -> np.ndarray:
+    """
+    Evaluates one formula over whole arrays. Values may be scalars or arrays of
+    length `size`; the allowed functions map onto their NumPy element-wise forms.
+    """
+    code = _compiled_formula(expression, values)
+    with np.errstate(divide="raise", invalid="raise"):
+        result = eval(code, _VECTOR_FORMULA_GLOBALS, values)  # noqa: S307
+    return np.broadcast_to(np.asarray(result, dtype=np.float64), (size,)).copy()
+
+
 def _next_formula_version(name: str, beam_type: str) -> int:
-    row = query_one(
+    row = query_row(
         """
         SELECT COALESCE(MAX(version), 0) AS max_version
         FROM formulas
@@ -171,8 +221,20 @@ def list_formulas(beam_type: str | None = None) -> list[dict]:
     return rows
 
 
+def list_eligible_formulas() -> list[dict]:
+    # Skips the JSON decoding in list_formulas; the activation picker only shows ids, names and versions.
+    return query_all(
+        """
+        SELECT id, beam_type, name, version
+        FROM formulas
+        WHERE status NOT IN ('active', 'invalid')
+        ORDER BY beam_type, name, version DESC
+        """
+    )
+
+
 def activate_formula(formula_id: int) -> None:
-    formula = query_one("SELECT * FROM formulas WHERE id = ?", (formula_id,))
+    formula = query_row("SELECT * FROM formulas WHERE id = ?", (formula_id,))
     if not formula:
         raise ValueError("Formula not found.")
     if formula["status"] == "invalid":
@@ -187,9 +249,9 @@ def activate_formula(formula_id: int) -> None:
 
 
 def get_active_formula(beam_type: str) -> dict | None:
-    row = query_one(
+    active = query_row(
         """
-        SELECT *
+        SELECT id
         FROM formulas
         WHERE beam_type = ? AND status = 'active'
         ORDER BY created_at DESC, id DESC
@@ -197,27 +259,37 @@ def get_active_formula(beam_type: str) -> dict | None:
         """,
         (beam_type,),
     )
-    if not row:
+    if not active:
         return None
 
-    row["variables"] = load_json(row.get("variables_json"), [])
-    row["units"] = load_json(row.get("units_json"), {})
-    row["validation_errors"] = load_json(row.get("validation_errors_json"), [])
-    return row
+    # Formula rows are immutable apart from status, so the decoded row is keyed by id.
+    formula_id = int(active["id"])
+    cached = _ACTIVE_FORMULA_CACHE.get(formula_id)
+    if cached is None:
+        row = query_one("SELECT * FROM formulas WHERE id = ?", (formula_id,))
+        if not row:
+            return None
+        row["variables"] = load_json(row.get("variables_json"), [])
+        row["units"] = load_json(row.get("units_json"), {})
+        row["validation_errors"] = load_json(row.get("validation_errors_json"), [])
+        if len(_ACTIVE_FORMULA_CACHE) >= _ACTIVE_FORMULA_CACHE_MAX_ENTRIES:
+            oldest_key = next(iter(_ACTIVE_FORMULA_CACHE))
+            _ACTIVE_FORMULA_CACHE.pop(oldest_key, None)
+        _ACTIVE_FORMULA_CACHE[formula_id] = row
+        cached = row
+
+    result = dict(cached)
+    result["status"] = "active"
+    return result
 
 
 def seed_default_formulas() -> None:
+    active_beam_types = {
+        str(row["beam_type"])
+        for row in query_rows("SELECT DISTINCT beam_type FROM formulas WHERE status = 'active'")
+    }
     for default in DEFAULT_FORMULAS:
-        existing = query_one(
-            """
-            SELECT id
-            FROM formulas
-            WHERE beam_type = ? AND status = 'active'
-            LIMIT 1
-            """,
-            (default["beam_type"],),
-        )
-        if existing:
+        if default["beam_type"] in active_beam_types:
             continue
 
         formula_id, errors = create_formula(
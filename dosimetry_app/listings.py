@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import pandas as pd
+import streamlit as st
+
+from dosimetry_app.database import load_json
+from dosimetry_app.datasets import (
+    list_datasets,
+    list_eligible_datasets,
+    list_environment_locations,
+    load_dataset_frame,
+)
+from dosimetry_app.formulas import list_eligible_formulas, list_formulas
+from dosimetry_app.runs import get_run, list_run_summaries
+from dosimetry_app.settings import ENV_SOURCE_AUTO, ENV_SOURCE_DATASET, get_environment_settings
+
+# Handlers that write a registry clear the matching cache; the TTL bounds staleness from other sessions.
+LISTING_TTL_SECONDS = 30
+
+
+@st.cache_data(ttl=LISTING_TTL_SECONDS, show_spinner=False)
+def cached_list_datasets() -> list[dict]:
+    rows = list_datasets()
+    # Parsed here so the registry table reuses the joined text for the life of the cache entry.
+    for row in rows:
+        row["validation_errors_text"] = ", ".join(load_json(row["validation_errors_json"], []))
+    return rows
+
+
+@st.cache_data(ttl=LISTING_TTL_SECONDS, show_spinner=False)
+def cached_list_eligible_datasets() -> list[dict]:
+    return list_eligible_datasets()
+
+
+@st.cache_data(ttl=LISTING_TTL_SECONDS, show_spinner=False)
+def cached_environment_locations() -> list[str]:
+    return list_environment_locations()
+
+
+_ENV_SOURCE_LABELS = {ENV_SOURCE_AUTO: "Auto (IP + Weather API)", ENV_SOURCE_DATASET: "Dataset"}
+
+
+@st.cache_data(ttl=LISTING_TTL_SECONDS, show_spinner=False)
+def cached_environment_source_label() -> str:
+    env_source = str(get_environment_settings().get("env_source", ""))
+    return _ENV_SOURCE_LABELS.get(env_source, env_source or "Unknown")
+
+
+def clear_dataset_listings() -> None:
+    cached_list_datasets.clear()
+    cached_list_eligible_datasets.clear()
+    cached_environment_locations.clear()
+
+
+@st.cache_data(ttl=LISTING_TTL_SECONDS, show_spinner=False)
+def cached_list_formulas() -> list[dict]:
+    return list_formulas()
+
+
+@st.cache_data(ttl=LISTING_TTL_SECONDS, show_spinner=False)
+def cached_list_eligible_formulas() -> list[dict]:
+    return list_eligible_formulas()
+
+
+def clear_formula_listings() -> None:
+    cached_list_formulas.clear()
+    cached_list_eligible_formulas.clear()
+
+
+@st.cache_data(ttl=LISTING_TTL_SECONDS, show_spinner=False)
+def cached_list_run_summaries(limit: int = 200) -> list[dict]:
+    return list_run_summaries(limit=limit)
+
+
+@st.cache_data(ttl=300, show_spinner=False, max_entries=64)
+def _cached_recorded_run(run_id: int) -> dict:
+    # Recorded runs never change, so each id is fetched and decoded once rather than on every rerun.
+    run = get_run(run_id)
+    if run is None:
+        # Exceptions are not cached, so an id that is recorded later is found on the next lookup.
+        raise LookupError(run_id)
+    return run
+
+
+def cached_run_detail(run_id: int) -> dict | None:
+    try:
+        return _cached_recorded_run(run_id)
+    except LookupError:
+        return None
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def cached_dataset_preview(dataset_id: int, checksum: str, rows: int = 50) -> pd.DataFrame | None:
+    # Keyed on the dataset record, so an activation or re-upload misses instead of serving a stale preview.
+    frame = load_dataset_frame(dataset_id)
+    return None if frame is None else frame.head(rows).copy()
+
+
+_DATASET_REGISTRY_COLUMNS = (
+    "id",
+    "dataset_type",
+    "version",
+    "status",
+    "validation_status",
+    "uploaded_by",
+    "uploaded_at",
+    "notes",
+)
+_RUN_HISTORY_COLUMNS = (
+    "id",
+    "run_ts",
+    "username",
+    "beam_type",
+    "formula_name",
+    "formula_version",
+    "dose_per_100mu_gy",
+)
+
+
+def dataset_registry_frame(rows: list[dict]) -> pd.DataFrame:
+    # Column-wise construction skips the per-row dicts and lets pandas infer each dtype once.
+    columns = {column: [row[column] for row in rows] for column in _DATASET_REGISTRY_COLUMNS}
+    columns["validation_errors"] = [row["validation_errors_text"] for row in rows]
+    return pd.DataFrame(columns)
+
+
+def formula_registry_frame(rows: list[dict]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": [row["id"] for row in rows],
+            "beam_type": [row["beam_type"] for row in rows],
+            "name": [row["name"] for row in rows],
+            "version": [row["version"] for row in rows],
+            "status": [row["status"] for row in rows],
+            "expression": [row["expression"] for row in rows],
+            "variables": [", ".join(row["variables"]) for row in rows],
+            "validation_errors": [", ".join(row["validation_errors"]) for row in rows],
+            "created_by": [row["created_by"] for row in rows],
+            "created_at": [row["created_at"] for row in rows],
+        }
+    )
+
+
+def run_history_frame(rows: list[dict]) -> pd.DataFrame:
+    return pd.DataFrame.from_records(rows, columns=list(_RUN_HISTORY_COLUMNS))
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dosimetry_app.database import dump_json, execute, load_json, query_all, query_one
+from dosimetry_app.database import dump_json, execute, load_json, query_all, query_one, query_row
 
 
 def record_run(
@@ -34,6 +34,13 @@ def record_run(
     )
 
 
+def _decode_run(row: dict) -> dict:
+    row["inputs"] = load_json(row.get("inputs_json"), {})
+    row["outputs"] = load_json(row.get("outputs_json"), {})
+    row["dataset_versions"] = load_json(row.get("dataset_versions_json"), {})
+    return row
+
+
 def list_runs(limit: int = 200) -> list[dict]:
     rows = query_all(
         """
@@ -44,19 +51,39 @@ def list_runs(limit: int = 200) -> list[dict]:
         """,
         (limit,),
     )
-    for row in rows:
-        row["inputs"] = load_json(row.get("inputs_json"), {})
-        row["outputs"] = load_json(row.get("outputs_json"), {})
-        row["dataset_versions"] = load_json(row.get("dataset_versions_json"), {})
-    return rows
+    return [_decode_run(row) for row in rows]
+
+
+def list_run_summaries(limit: int = 200) -> list[dict]:
+    # The history table needs one nested output, so SQLite extracts it and the JSON payloads are never decoded.
+    # Rows from the stdlib encoder may hold NaN literals that json_extract rejects; those show no dose.
+    return query_all(
+        """
+        SELECT
+            id, run_ts, username, beam_type, formula_name, formula_version,
+            CASE WHEN json_valid(outputs_json)
+                THEN json_extract(outputs_json, '$.outputs.dose_per_100mu_gy')
+            END AS dose_per_100mu_gy
+        FROM calculator_runs
+        ORDER BY run_ts DESC, id DESC
+        LIMIT ?
+        """,
+        (limit,),
+    )
+
+
+def count_runs(limit: int | None = None) -> int:
+    # Counts in SQL so callers that only need a total skip decoding the JSON payloads. The inner LIMIT stops
+    # the scan after `limit` rows (SQLite treats -1 as no limit); order cannot change the count, so there is no sort.
+    row = query_row(
+        "SELECT COUNT(*) FROM (SELECT 1 FROM calculator_runs LIMIT ?)",
+        (-1 if limit is None else limit,),
+    )
+    return int(row[0]) if row else 0
 
 
 def get_run(run_id: int) -> dict | None:
     row = query_one("SELECT * FROM calculator_runs WHERE id = ?", (run_id,))
     if not row:
         return None
-    row["inputs"] = load_json(row.get("inputs_json"), {})
-    row["outputs"] = load_json(row.get("outputs_json"), {})
-    row["dataset_versions"] = load_json(row.get("dataset_versions_json"), {})
-    return row
-
+    return _decode_run(row)
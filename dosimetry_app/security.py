@@ -2,10 +2,59 @@ import hashlib
 import hmac
 import os
 
-PBKDF2_ITERATIONS = 390000
+DEFAULT_PBKDF2_ITERATIONS = 390000
+MIN_PBKDF2_ITERATIONS = 100000
+
+PASSWORD_SCHEME_PBKDF2 = "pbkdf2"
+PASSWORD_SCHEME_SCRYPT = "scrypt"
+SCRYPT_N = 2**15
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+
+
+def _configured_iterations() -> int:
+    raw = os.getenv("DOSIMETRY_PBKDF2_ITERATIONS", "").strip()
+    try:
+        iterations = int(raw) if raw else DEFAULT_PBKDF2_ITERATIONS
+    except ValueError:
+        iterations = DEFAULT_PBKDF2_ITERATIONS
+    return max(iterations, MIN_PBKDF2_ITERATIONS)
+
+
+def _configured_scheme() -> str:
+    raw = os.getenv("DOSIMETRY_PASSWORD_SCHEME", "").strip().lower()
+    if raw == PASSWORD_SCHEME_SCRYPT and hasattr(hashlib, "scrypt"):
+        return PASSWORD_SCHEME_SCRYPT
+    return PASSWORD_SCHEME_PBKDF2
+
+
+PBKDF2_ITERATIONS = _configured_iterations()
+PASSWORD_SCHEME = _configured_scheme()
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=SCRYPT_MAXMEM,
+        dklen=SCRYPT_DKLEN,
+    )
+
+
+def hash_password_scrypt(password: str) -> str:
+    salt = os.urandom(16)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"{PASSWORD_SCHEME_SCRYPT}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
 
 
 def hash_password(password: str) -> str:
+    if PASSWORD_SCHEME == PASSWORD_SCHEME_SCRYPT:
+        return hash_password_scrypt(password)
     salt = os.urandom(16)
     digest = hashlib.pbkdf2_hmac(
         "sha256",
@@ -16,7 +65,18 @@ def hash_password(password: str) -> str:
     return f"{PBKDF2_ITERATIONS}${salt.hex()}${digest.hex()}"
 
 
+def _verify_scrypt(password: str, stored_hash: str) -> bool:
+    try:
+        _, n_raw, r_raw, p_raw, salt_hex, digest_hex = stored_hash.split("$")
+        candidate = _scrypt(password, bytes.fromhex(salt_hex), int(n_raw), int(r_raw), int(p_raw)).hex()
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(candidate, digest_hex)
+
+
 def verify_password(password: str, stored_hash: str) -> bool:
+    if stored_hash.startswith(f"{PASSWORD_SCHEME_SCRYPT}$"):
+        return _verify_scrypt(password, stored_hash)
     try:
         iterations_raw, salt_hex, digest_hex = stored_hash.split("$")
         iterations = int(iterations_raw)
@@ -32,3 +92,12 @@ def verify_password(password: str, stored_hash: str) -> bool:
     ).hex()
     return hmac.compare_digest(candidate, digest_hex)
 
+
+def needs_rehash(stored_hash: str) -> bool:
+    if PASSWORD_SCHEME == PASSWORD_SCHEME_SCRYPT:
+        return not stored_hash.startswith(f"{PASSWORD_SCHEME_SCRYPT}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+    try:
+        iterations = int(stored_hash.split("$", 1)[0])
+    except (ValueError, TypeError):
+        return True
+    return iterations != PBKDF2_ITERATIONS
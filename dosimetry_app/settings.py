@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from dosimetry_app.database import execute_transaction, query_all, query_one
+from itertools import chain
+from threading import Lock
+
+from dosimetry_app.database import execute_transaction, in_transaction, query_rows
 
 ENV_SOURCE_MANUAL = "Manual"
 ENV_SOURCE_DATASET = "Dataset"
@@ -35,6 +38,10 @@ LEGACY_HARARE_DEFAULT_SETTINGS = {
     "ktp_source": KTP_SOURCE_AUTO_AUTO,
 }
 
+_SETTINGS_CACHE_LOCK = Lock()
+_SETTINGS_CACHE: dict[str, str] | None = None
+_SETTINGS_CACHE_GENERATION = 0
+
 
 def _safe_float(value: str | None, fallback: float) -> float:
     try:
@@ -45,23 +52,54 @@ def _safe_float(value: str | None, fallback: float) -> float:
         return fallback
 
 
-def ensure_default_settings() -> None:
-    commands: list[tuple[str, tuple[str, str]]] = []
-    for key, value in DEFAULT_SETTINGS.items():
-        existing = query_one("SELECT key FROM app_settings WHERE key = ?", (key,))
-        if existing:
-            continue
-        commands.append(
+def _cached_settings() -> dict[str, str]:
+    global _SETTINGS_CACHE
+    with _SETTINGS_CACHE_LOCK:
+        if _SETTINGS_CACHE is not None:
+            return _SETTINGS_CACHE
+        generation = _SETTINGS_CACHE_GENERATION
+
+    # Queried outside the cache lock so a transaction holding the connection can still invalidate the cache.
+    rows = query_rows("SELECT key, value FROM app_settings")
+    settings = {str(row["key"]): str(row["value"]) for row in rows}
+    # Rows read inside an open transaction may still roll back, and a write since the query makes them stale.
+    if not in_transaction():
+        with _SETTINGS_CACHE_LOCK:
+            if generation == _SETTINGS_CACHE_GENERATION:
+                _SETTINGS_CACHE = settings
+    return settings
+
+
+def _invalidate_settings_cache() -> None:
+    global _SETTINGS_CACHE, _SETTINGS_CACHE_GENERATION
+    with _SETTINGS_CACHE_LOCK:
+        _SETTINGS_CACHE = None
+        _SETTINGS_CACHE_GENERATION += 1
+
+
+def _upsert_settings(items: list[tuple[str, str]], overwrite: bool = True) -> None:
+    # One multi-row statement instead of a statement per key.
+    placeholders = ", ".join(["(?, ?, CURRENT_TIMESTAMP)"] * len(items))
+    conflict = (
+        "DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP" if overwrite else "DO NOTHING"
+    )
+    execute_transaction(
+        [
             (
-                """
-                INSERT INTO app_settings (key, value)
-                VALUES (?, ?)
+                f"""
+                INSERT INTO app_settings (key, value, updated_at)
+                VALUES {placeholders}
+                ON CONFLICT(key) {conflict}
                 """,
-                (key, value),
+                tuple(chain.from_iterable(items)),
             )
-        )
-    if commands:
-        execute_transaction(commands)
+        ]
+    )
+    _invalidate_settings_cache()
+
+
+def ensure_default_settings() -> None:
+    _upsert_settings(list(DEFAULT_SETTINGS.items()), overwrite=False)
 
 
 def apply_live_detection_defaults_for_legacy_installations() -> None:
@@ -94,32 +132,15 @@ def apply_live_detection_defaults_for_legacy_installations() -> None:
 
 
 def get_setting(key: str, default: str | None = None) -> str | None:
-    row = query_one("SELECT value FROM app_settings WHERE key = ?", (key,))
-    if row:
-        return str(row["value"])
-    return default
+    return _cached_settings().get(key, default)
 
 
 def set_setting(key: str, value: str) -> None:
-    execute_transaction(
-        [
-            (
-                """
-                INSERT INTO app_settings (key, value, updated_at)
-                VALUES (?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(key) DO UPDATE SET
-                    value = excluded.value,
-                    updated_at = CURRENT_TIMESTAMP
-                """,
-                (key, value),
-            )
-        ]
-    )
+    _upsert_settings([(key, value)])
 
 
 def list_settings() -> dict[str, str]:
-    rows = query_all("SELECT key, value FROM app_settings")
-    return {str(row["key"]): str(row["value"]) for row in rows}
+    return dict(_cached_settings())
 
 
 def get_environment_settings() -> dict[str, str | float]:
@@ -151,56 +172,12 @@ def save_environment_settings(
     env_dataset_location: str,
     ktp_source: str = KTP_SOURCE_AUTO_AUTO,
 ) -> None:
-    commands = [
-        (
-            """
-            INSERT INTO app_settings (key, value, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(key) DO UPDATE SET
-                value = excluded.value,
-                updated_at = CURRENT_TIMESTAMP
-            """,
+    _upsert_settings(
+        [
             ("env_source", str(env_source)),
-        ),
-        (
-            """
-            INSERT INTO app_settings (key, value, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(key) DO UPDATE SET
-                value = excluded.value,
-                updated_at = CURRENT_TIMESTAMP
-            """,
             ("env_manual_temperature_c", str(env_manual_temperature_c)),
-        ),
-        (
-            """
-            INSERT INTO app_settings (key, value, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(key) DO UPDATE SET
-                value = excluded.value,
-                updated_at = CURRENT_TIMESTAMP
-            """,
             ("env_manual_pressure_kpa", str(env_manual_pressure_kpa)),
-        ),
-        (
-            """
-            INSERT INTO app_settings (key, value, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(key) DO UPDATE SET
-                value = excluded.value,
-                updated_at = CURRENT_TIMESTAMP
-            """,
             ("env_dataset_location", env_dataset_location),
-        ),
-        (
-            """
-            INSERT INTO app_settings (key, value, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(key) DO UPDATE SET
-                value = excluded.value,
-                updated_at = CURRENT_TIMESTAMP
-            """,
             ("ktp_source", str(ktp_source)),
-        ),
-    ]
-    execute_transaction(commands)
+        ]
+    )
@@ -15,13 +15,22 @@ section[data-testid="stSidebar"] { display: none !important; }
 """
 
 
-def apply_theme() -> None:
-    css_text = FALLBACK_STYLE
-    if Path(STYLE_FILE).exists():
-        try:
-            css_text = Path(STYLE_FILE).read_text(encoding="utf-8")
-        except OSError:
-            css_text = FALLBACK_STYLE
+_STYLE_MARKUP: str | None = None
+
 
-    st.markdown(f"<style>{css_text}</style>", unsafe_allow_html=True)
+def _style_markup() -> str:
+    # style.css ships with the app, so it is read once per process rather than on every rerun.
+    global _STYLE_MARKUP
+    if _STYLE_MARKUP is None:
+        css_text = FALLBACK_STYLE
+        if Path(STYLE_FILE).exists():
+            try:
+                css_text = Path(STYLE_FILE).read_text(encoding="utf-8")
+            except OSError:
+                css_text = FALLBACK_STYLE
+        _STYLE_MARKUP = f"<style>{css_text}</style>"
+    return _STYLE_MARKUP
 
+
+def apply_theme() -> None:
+    st.markdown(_style_markup(), unsafe_allow_html=True)
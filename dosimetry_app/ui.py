@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import pandas as pd
 import streamlit as st
 
 from dosimetry_app.auth import authenticate
 
 
 def init_session_state() -> None:
+    # Every auth helper calls this on each rerun; after the first call it is a single membership test.
+    if "_auth_init" in st.session_state:
+        return
     st.session_state.setdefault("authenticated", False)
     st.session_state.setdefault("user", None)
+    st.session_state["_auth_init"] = True
 
 
+@st.fragment
 def login_widget() -> None:
+    # A failed sign-in only reruns the form; a successful one reruns the whole app via st.rerun().
     init_session_state()
     if st.session_state["authenticated"]:
         return
@@ -56,33 +63,51 @@ def require_roles(allowed_roles: set[str]) -> dict:
     return user
 
 
+@st.fragment
+def _render_session_panel() -> None:
+    st.markdown("### Session")
+    if st.session_state["authenticated"] and st.session_state["user"]:
+        user = st.session_state["user"]
+        st.write(f"User: `{user['username']}`")
+        st.write(f"Role: `{user['role']}`")
+        logout_button()
+    else:
+        st.write("Not signed in")
+
+
 def render_sidebar_user() -> None:
     init_session_state()
+    # Fragments cannot open st.sidebar themselves, so the panel fragment is called inside it.
     with st.sidebar:
-        st.markdown("### Session")
-        if st.session_state["authenticated"] and st.session_state["user"]:
-            user = st.session_state["user"]
-            st.write(f"User: `{user['username']}`")
-            st.write(f"Role: `{user['role']}`")
-            logout_button()
-        else:
-            st.write("Not signed in")
+        _render_session_panel()
+
+
+ADMIN_NAV_LINKS: tuple[tuple[str, str, str], ...] = (
+    ("calculator", "pages/1_Calculator.py", "Calculator"),
+    ("home", "pages/9_Admin_Portal.py", "Admin Home"),
+    ("datasets", "pages/2_Admin_Datasets.py", "Datasets"),
+    ("formulas", "pages/3_Admin_Formulas.py", "Formulas"),
+    ("history", "pages/4_Run_History.py", "Run History"),
+)
 
 
 def render_admin_nav(current: str = "") -> None:
-    nav = st.columns(5)
-    with nav[0]:
-        if st.button("Calculator", key=f"nav_calc_{current}"):
-            st.switch_page("pages/1_Calculator.py")
-    with nav[1]:
-        if st.button("Admin Home", key=f"nav_home_{current}"):
-            st.switch_page("pages/9_Admin_Portal.py")
-    with nav[2]:
-        if st.button("Datasets", key=f"nav_data_{current}"):
-            st.switch_page("pages/2_Admin_Datasets.py")
-    with nav[3]:
-        if st.button("Formulas", key=f"nav_formula_{current}"):
-            st.switch_page("pages/3_Admin_Formulas.py")
-    with nav[4]:
-        if st.button("Run History", key=f"nav_runs_{current}"):
-            st.switch_page("pages/4_Run_History.py")
+    # Page links navigate client-side, so the nav row registers no button state and triggers no extra rerun.
+    nav = st.columns(len(ADMIN_NAV_LINKS))
+    for column, (key, page, label) in zip(nav, ADMIN_NAV_LINKS):
+        with column:
+            st.page_link(page, label=label, disabled=key == current)
+
+
+def paginated_dataframe(frame: pd.DataFrame, key: str, page_size: int = 50) -> None:
+    # Only the visible slice is serialized to Arrow, so long registries cost one page per rerun.
+    total = len(frame)
+    page_count = max(1, -(-total // page_size))
+    page = 1
+    if page_count > 1:
+        page = int(st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key=key))
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+    st.dataframe(frame.iloc[start:end], use_container_width=True)
+    if page_count > 1:
+        st.caption(f"Rows {start + 1}-{end} of {total}")
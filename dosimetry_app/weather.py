@@ -1,80 +1,172 @@
 from __future__ import annotations
 
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional runtime dependency
+    orjson = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except Exception:  # pragma: no cover - optional runtime dependency
+    requests = None
+
 IP_GEO_ENDPOINT = "https://ipapi.co/json/"
 OPEN_METEO_ENDPOINT = "https://api.open-meteo.com/v1/forecast"
 OPEN_METEO_GEOCODE_ENDPOINT = "https://geocoding-api.open-meteo.com/v1/search"
 OPEN_METEO_REVERSE_GEOCODE_ENDPOINT = "https://geocoding-api.open-meteo.com/v1/reverse"
 NOMINATIM_REVERSE_ENDPOINT = "https://nominatim.openstreetmap.org/reverse"
 HTTP_TIMEOUT_SECONDS = 10
-AFRICA_COUNTRY_CODES = {
-    "DZ",
-    "AO",
-    "BJ",
-    "BW",
-    "BF",
-    "BI",
-    "CM",
-    "CV",
-    "CF",
-    "TD",
-    "KM",
-    "CG",
-    "CD",
-    "DJ",
-    "EG",
-    "GQ",
-    "ER",
-    "SZ",
-    "ET",
-    "GA",
-    "GM",
-    "GH",
-    "GN",
-    "GW",
-    "CI",
-    "KE",
-    "LS",
-    "LR",
-    "LY",
-    "MG",
-    "MW",
-    "ML",
-    "MR",
-    "MU",
-    "MA",
-    "MZ",
-    "NA",
-    "NE",
-    "NG",
-    "RW",
-    "ST",
-    "SN",
-    "SC",
-    "SL",
-    "SO",
-    "ZA",
-    "SS",
-    "SD",
-    "TZ",
-    "TG",
-    "TN",
-    "UG",
-    "ZM",
-    "ZW",
+HTTP_USER_AGENT = "dosimetry-streamlit-app/1.0"
+COORDINATE_CACHE_DECIMALS = 3
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_TTL_SECONDS = {
+    IP_GEO_ENDPOINT: 3600.0,
+    OPEN_METEO_ENDPOINT: 600.0,
+    OPEN_METEO_GEOCODE_ENDPOINT: 86400.0,
+    OPEN_METEO_REVERSE_GEOCODE_ENDPOINT: 86400.0,
+    NOMINATIM_REVERSE_ENDPOINT: 86400.0,
 }
+AFRICA_COUNTRY_CODES: frozenset[str] = frozenset(
+    {
+        "DZ",
+        "AO",
+        "BJ",
+        "BW",
+        "BF",
+        "BI",
+        "CM",
+        "CV",
+        "CF",
+        "TD",
+        "KM",
+        "CG",
+        "CD",
+        "DJ",
+        "EG",
+        "GQ",
+        "ER",
+        "SZ",
+        "ET",
+        "GA",
+        "GM",
+        "GH",
+        "GN",
+        "GW",
+        "CI",
+        "KE",
+        "LS",
+        "LR",
+        "LY",
+        "MG",
+        "MW",
+        "ML",
+        "MR",
+        "MU",
+        "MA",
+        "MZ",
+        "NA",
+        "NE",
+        "NG",
+        "RW",
+        "ST",
+        "SN",
+        "SC",
+        "SL",
+        "SO",
+        "ZA",
+        "SS",
+        "SD",
+        "TZ",
+        "TG",
+        "TN",
+        "UG",
+        "ZM",
+        "ZW",
+    }
+)
 
 
-def _fetch_json(url: str) -> dict:
-    request = Request(url, headers={"User-Agent": "dosimetry-streamlit-app/1.0"})
-    with urlopen(request, timeout=HTTP_TIMEOUT_SECONDS) as response:  # noqa: S310
-        body = response.read().decode("utf-8")
+def _is_african(result: dict) -> bool:
+    country_code = result.get("country_code") or ""
+    if not isinstance(country_code, str):
+        country_code = str(country_code)
+    # Open-Meteo already returns upper-case codes, so upper() only runs for the rare mixed-case value.
+    return country_code in AFRICA_COUNTRY_CODES or country_code.upper() in AFRICA_COUNTRY_CODES
+
+
+_WEATHER_QUERY_SUFFIX = urlencode({"current": "temperature_2m,surface_pressure", "timezone": "auto"})
+
+_RESPONSE_CACHE_LOCK = Lock()
+_RESPONSE_CACHE: dict[str, tuple[float, dict]] = {}
+
+
+def _build_session():
+    if requests is None:
+        return None
+    session = requests.Session()
+    session.headers["User-Agent"] = HTTP_USER_AGENT
+    # Pooled keep-alive connections let geocoding and weather calls to the same host share one TLS session.
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _build_session()
+
+
+def _parse_json(body: bytes) -> dict:
+    if orjson is not None:
+        return orjson.loads(body)
     return json.loads(body)
 
 
+def _request_json(url: str) -> dict:
+    if _SESSION is not None:
+        response = _SESSION.get(url, timeout=HTTP_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return _parse_json(response.content)
+
+    request = Request(url, headers={"User-Agent": HTTP_USER_AGENT})
+    with urlopen(request, timeout=HTTP_TIMEOUT_SECONDS) as response:  # noqa: S310
+        body = response.read()
+    return _parse_json(body)
+
+
+def _fetch_json(url: str) -> dict:
+    # Streamlit reruns the page on every interaction, so successful responses are reused until their TTL expires.
+    ttl = RESPONSE_CACHE_TTL_SECONDS.get(url.split("?", 1)[0], 0.0)
+    now = time.monotonic()
+    with _RESPONSE_CACHE_LOCK:
+        cached = _RESPONSE_CACHE.pop(url, None)
+        if cached and cached[0] > now:
+            # Re-inserting on a hit keeps eviction least-recently-used rather than first-in-first-out.
+            _RESPONSE_CACHE[url] = cached
+            return cached[1]
+
+    payload = _request_json(url)
+    if ttl > 0:
+        with _RESPONSE_CACHE_LOCK:
+            _RESPONSE_CACHE.pop(url, None)
+            if len(_RESPONSE_CACHE) >= RESPONSE_CACHE_MAX_ENTRIES:
+                oldest_key = next(iter(_RESPONSE_CACHE))
+                _RESPONSE_CACHE.pop(oldest_key, None)
+            _RESPONSE_CACHE[url] = (now + ttl, payload)
+    return payload
+
+
 def detect_location_from_ip() -> dict:
     payload = _fetch_json(IP_GEO_ENDPOINT)
     latitude = payload.get("latitude") or payload.get("lat")
@@ -106,8 +198,7 @@ def geocode_location(location_query: str) -> dict:
     if not results:
         raise ValueError(f"No geocoding results for '{location_query}'.")
 
-    african_results = [result for result in results if str(result.get("country_code", "")).upper() in AFRICA_COUNTRY_CODES]
-    selected = african_results[0] if african_results else results[0]
+    selected = next((result for result in results if _is_african(result)), results[0])
 
     name = selected.get("name")
     admin1 = selected.get("admin1")
@@ -135,8 +226,8 @@ def reverse_geocode_coordinates(latitude: float, longitude: float) -> dict:
     # Primary provider: Open-Meteo reverse geocoding.
     query = urlencode(
         {
-            "latitude": latitude,
-            "longitude": longitude,
+            "latitude": round(latitude, COORDINATE_CACHE_DECIMALS),
+            "longitude": round(longitude, COORDINATE_CACHE_DECIMALS),
             "count": 10,
             "language": "en",
             "format": "json",
@@ -146,10 +237,7 @@ def reverse_geocode_coordinates(latitude: float, longitude: float) -> dict:
         payload = _fetch_json(f"{OPEN_METEO_REVERSE_GEOCODE_ENDPOINT}?{query}")
         results = payload.get("results") or []
         if results:
-            african_results = [
-                result for result in results if str(result.get("country_code", "")).upper() in AFRICA_COUNTRY_CODES
-            ]
-            selected = african_results[0] if african_results else results[0]
+            selected = next((result for result in results if _is_african(result)), results[0])
 
             name = selected.get("name")
             admin1 = selected.get("admin1")
@@ -171,8 +259,8 @@ def reverse_geocode_coordinates(latitude: float, longitude: float) -> dict:
     # Fallback provider: Nominatim reverse geocoding.
     fallback_query = urlencode(
         {
-            "lat": latitude,
-            "lon": longitude,
+            "lat": round(latitude, COORDINATE_CACHE_DECIMALS),
+            "lon": round(longitude, COORDINATE_CACHE_DECIMALS),
             "format": "jsonv2",
             "addressdetails": 1,
             "zoom": 10,
@@ -214,15 +302,9 @@ def reverse_geocode_coordinates(latitude: float, longitude: float) -> dict:
 
 
 def fetch_current_environment(latitude: float, longitude: float) -> dict:
-    query = urlencode(
-        {
-            "latitude": latitude,
-            "longitude": longitude,
-            "current": "temperature_2m,surface_pressure",
-            "timezone": "auto",
-        }
-    )
-    payload = _fetch_json(f"{OPEN_METEO_ENDPOINT}?{query}")
+    latitude = round(latitude, COORDINATE_CACHE_DECIMALS)
+    longitude = round(longitude, COORDINATE_CACHE_DECIMALS)
+    payload = _fetch_json(f"{OPEN_METEO_ENDPOINT}?latitude={latitude}&longitude={longitude}&{_WEATHER_QUERY_SUFFIX}")
     current = payload.get("current") or {}
     temperature_c = current.get("temperature_2m")
     pressure_hpa = current.get("surface_pressure")
@@ -237,6 +319,29 @@ def fetch_current_environment(latitude: float, longitude: float) -> dict:
     }
 
 
+def fetch_environment_and_reverse(
+    latitude: float,
+    longitude: float,
+    include_reverse: bool = True,
+) -> tuple[dict, dict | None]:
+    """
+    Fetches current weather and, optionally, reverse-geocodes the same point
+    concurrently. Weather errors propagate; reverse-geocoding errors yield None.
+    """
+    if not include_reverse:
+        return fetch_current_environment(latitude, longitude), None
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        weather_future = executor.submit(fetch_current_environment, latitude, longitude)
+        reverse_future = executor.submit(reverse_geocode_coordinates, latitude, longitude)
+        weather = weather_future.result()
+        try:
+            reverse_geo = reverse_future.result()
+        except Exception:
+            reverse_geo = None
+    return weather, reverse_geo
+
+
 def auto_detect_environment(preferred_location: str | None = None) -> dict:
     if preferred_location and preferred_location.strip():
         location = geocode_location(preferred_location.strip())
@@ -3,6 +3,7 @@ from html import escape as html_escape
 import json
 import csv
 import io
+import re
 
 import streamlit as st
 from typing import Any
@@ -19,6 +20,7 @@ from dosimetry_app.datasets import (
     get_environment_from_dataset,
     list_available_chambers,
 )
+from dosimetry_app.listings import cached_list_run_summaries
 from dosimetry_app.runs import record_run
 from dosimetry_app.config import DEFAULT_P0_KPA, DEFAULT_T0_C
 from dosimetry_app.settings import (
@@ -32,17 +34,14 @@ from dosimetry_app.settings import (
 )
 from dosimetry_app.theme import apply_theme
 from dosimetry_app.ui import init_session_state
-from dosimetry_app.weather import (
-    fetch_current_environment,
-    reverse_geocode_coordinates,
-)
+from dosimetry_app.weather import fetch_environment_and_reverse
 
 initialize_application()
 apply_theme()
 init_session_state()
 
 
-GEOLOCATION_JS_EXPRESSION = """
+_GEOLOCATION_JS_SOURCE = """
 (async () => {
   const reverseGeocodeInBrowser = async (latitude, longitude) => {
     try {
@@ -127,20 +126,49 @@ GEOLOCATION_JS_EXPRESSION = """
 })()
 """
 
+# The script has no comments or whitespace-sensitive strings, so collapsing whitespace once at import is safe.
+GEOLOCATION_JS_EXPRESSION = re.sub(r"\s+", " ", _GEOLOCATION_JS_SOURCE).strip()
+
+
+_LOCAL_STATE_DEFAULTS: dict[str, object] = {
+    "live_environment_override": None,
+    "browser_geo_error": "",
+    "browser_geo_notice": "",
+    "browser_geo_attempted": False,
+    "browser_geo_pending": True,
+    "browser_geo_request_token": 1,
+    "browser_geo_processed_token": 0,
+    "browser_geo_last_update": "",
+    "auto_environment_warmup_done": False,
+}
+
+_JS_EVAL_UNAVAILABLE_MESSAGE = "Browser location is unavailable because `streamlit-js-eval` is not installed."
+
 
 def _ensure_local_state() -> None:
-    st.session_state.setdefault("live_environment_override", None)
-    st.session_state.setdefault("browser_geo_error", "")
-    st.session_state.setdefault("browser_geo_notice", "")
-    st.session_state.setdefault("browser_geo_attempted", False)
-    st.session_state.setdefault("browser_geo_pending", True)
-    st.session_state.setdefault("browser_geo_request_token", 1)
-    st.session_state.setdefault("browser_geo_processed_token", 0)
-    st.session_state.setdefault("browser_geo_last_update", "")
-    st.session_state.setdefault("auto_environment_warmup_done", False)
+    # Seed once per session; later reruns pay a single membership test instead of nine setdefault calls.
+    if "_calculator_state_init" in st.session_state:
+        return
+    st.session_state.update(
+        {key: value for key, value in _LOCAL_STATE_DEFAULTS.items() if key not in st.session_state}
+    )
+    if streamlit_js_eval is None:
+        # Without the component no request can ever complete, so settle the geolocation state up front.
+        st.session_state.update(
+            {
+                "browser_geo_processed_token": st.session_state.get("browser_geo_request_token", 1),
+                "browser_geo_pending": False,
+                "browser_geo_error": _JS_EVAL_UNAVAILABLE_MESSAGE,
+                "browser_geo_notice": "",
+                "browser_geo_attempted": True,
+            }
+        )
+    st.session_state["_calculator_state_init"] = True
 
 
 def _trigger_browser_location_request() -> None:
+    if streamlit_js_eval is None:
+        return
     current_token = int(st.session_state.get("browser_geo_request_token", 1))
     st.session_state["browser_geo_request_token"] = current_token + 1
     st.session_state["browser_geo_pending"] = True
@@ -166,16 +194,6 @@ def _ingest_browser_geolocation_payload() -> None:
     if request_token <= processed_token:
         return
 
-    if streamlit_js_eval is None:
-        st.session_state["browser_geo_processed_token"] = request_token
-        st.session_state["browser_geo_pending"] = False
-        st.session_state["browser_geo_error"] = (
-            "Browser location is unavailable because `streamlit-js-eval` is not installed."
-        )
-        st.session_state["browser_geo_notice"] = ""
-        st.session_state["browser_geo_attempted"] = True
-        return
-
     raw_payload = streamlit_js_eval(
         js_expressions=GEOLOCATION_JS_EXPRESSION,
         key=f"browser_geolocation_{request_token}",
@@ -205,8 +223,18 @@ def _ingest_browser_geolocation_payload() -> None:
         st.rerun()
         return
 
+    location_label = str(payload.get("location_label", "")).strip() or "Location detected"
+    city = str(payload.get("city", "")).strip()
+    country = str(payload.get("country", "")).strip()
+    country_code = str(payload.get("country_code", "")).strip()
+
+    # Weather and reverse geocoding are independent, so both requests run concurrently.
     try:
-        weather = fetch_current_environment(latitude=latitude, longitude=longitude)
+        weather, reverse_geo = fetch_environment_and_reverse(
+            latitude=latitude,
+            longitude=longitude,
+            include_reverse=not city or not country,
+        )
     except Exception:
         st.session_state["browser_geo_error"] = (
             "Location detected, but live weather service could not be reached. Please refresh."
@@ -215,22 +243,13 @@ def _ingest_browser_geolocation_payload() -> None:
         st.rerun()
         return
 
-    location_label = str(payload.get("location_label", "")).strip() or "Location detected"
-    city = str(payload.get("city", "")).strip()
-    country = str(payload.get("country", "")).strip()
-    country_code = str(payload.get("country_code", "")).strip()
-
-    if not city or not country:
-        try:
-            reverse_geo = reverse_geocode_coordinates(latitude=latitude, longitude=longitude)
-            if reverse_geo.get("location_label"):
-                location_label = str(reverse_geo["location_label"])
-            city = str(reverse_geo.get("city", "")).strip() or city
-            country = str(reverse_geo.get("country", "")).strip() or country
-            country_code = str(reverse_geo.get("country_code", "")).strip() or country_code
-        except Exception:
-            # Keep browser coordinates and continue without city/country enrichment.
-            pass
+    # Without reverse geocoding, keep browser coordinates and continue without city/country enrichment.
+    if reverse_geo:
+        if reverse_geo.get("location_label"):
+            location_label = str(reverse_geo["location_label"])
+        city = str(reverse_geo.get("city", "")).strip() or city
+        country = str(reverse_geo.get("country", "")).strip() or country
+        country_code = str(reverse_geo.get("country_code", "")).strip() or country_code
 
     if city and country:
         location_label = f"{city}, {country}"
@@ -239,6 +258,7 @@ def _ingest_browser_geolocation_payload() -> None:
     elif country:
         location_label = country
 
+    # Readings are coerced to float here once; header and calculation paths read them back as-is.
     environment = {
         "source": "browser_geolocation",
         "location": location_label,
@@ -262,6 +282,13 @@ def _ingest_browser_geolocation_payload() -> None:
     st.rerun()
 
 
+if streamlit_js_eval is None:
+
+    def _ingest_browser_geolocation_payload() -> None:
+        # _ensure_local_state already recorded the unavailable state; nothing to ingest on reruns.
+        return
+
+
 def _header_environment_snapshot(env_settings: dict) -> tuple[str, float | None, float | None]:
     source = str(env_settings["env_source"])
     if source == ENV_SOURCE_MANUAL:
@@ -283,8 +310,8 @@ def _header_environment_snapshot(env_settings: dict) -> tuple[str, float | None,
                 location_label = str(live_override.get("location", "Current location"))
             return (
                 location_label,
-                float(live_override.get("temperature_c")) if live_override.get("temperature_c") is not None else None,
-                float(live_override.get("pressure_kpa")) if live_override.get("pressure_kpa") is not None else None,
+                live_override.get("temperature_c"),
+                live_override.get("pressure_kpa"),
             )
         return "Waiting for browser location...", None, None
 
@@ -294,8 +321,8 @@ def _header_environment_snapshot(env_settings: dict) -> tuple[str, float | None,
             if env_row:
                 return (
                     str(env_row["location"]),
-                    float(env_row["temperature_c"]),
-                    float(env_row["pressure_kpa"]),
+                    env_row["temperature_c"],
+                    env_row["pressure_kpa"],
                 )
         except Exception:
             pass
@@ -327,6 +354,25 @@ def _header_status_text(env_settings: dict) -> str:
     return "Using fallback environmental values."
 
 
+def _memoized_header(env_settings: dict) -> tuple[str, float | None, float | None, str]:
+    # Dataset values can change under an admin activation, so only the session-derived sources are memoized.
+    source = str(env_settings["env_source"])
+    live_override = st.session_state.get("live_environment_override")
+    key = (
+        source,
+        str(env_settings["env_dataset_location"]),
+        st.session_state.get("browser_geo_last_update"),
+        bool(st.session_state.get("browser_geo_pending")),
+    )
+    cached = st.session_state.get("_header_cache")
+    if source != ENV_SOURCE_DATASET and cached and cached[0] == key and cached[1] is live_override:
+        return cached[2]
+
+    result = (*_header_environment_snapshot(env_settings), _header_status_text(env_settings))
+    st.session_state["_header_cache"] = (key, live_override, result)
+    return result
+
+
 def _resolve_environment(env_settings: dict) -> tuple[str, float, float, dict]:
     environmental_source = str(env_settings["env_source"])
     configured_location = str(env_settings["env_dataset_location"]) or None
@@ -340,8 +386,8 @@ def _resolve_environment(env_settings: dict) -> tuple[str, float, float, dict]:
         env_row = get_environment_from_dataset(configured_location)
         if not env_row:
             raise ValueError("No active environmental_data dataset values available.")
-        t_meas_c = float(env_row["temperature_c"])
-        p_meas_kpa = float(env_row["pressure_kpa"])
+        t_meas_c = env_row["temperature_c"]
+        p_meas_kpa = env_row["pressure_kpa"]
         environment_details = {
             "source": ENV_SOURCE_DATASET,
             "location": env_row["location"],
@@ -352,8 +398,8 @@ def _resolve_environment(env_settings: dict) -> tuple[str, float, float, dict]:
 
     if environmental_source == ENV_SOURCE_AUTO:
         if live_override and live_override.get("temperature_c") is not None and live_override.get("pressure_kpa") is not None:
-            t_meas_c = float(live_override["temperature_c"])
-            p_meas_kpa = float(live_override["pressure_kpa"])
+            t_meas_c = live_override["temperature_c"]
+            p_meas_kpa = live_override["pressure_kpa"]
             environment_details = dict(live_override)
             environment_details["override_used"] = True
             return environmental_source, t_meas_c, p_meas_kpa, environment_details
@@ -366,32 +412,60 @@ def _resolve_environment(env_settings: dict) -> tuple[str, float, float, dict]:
 
 
 def _flatten_details(payload: object, prefix: str = "") -> list[tuple[str, object]]:
-    if isinstance(payload, dict):
-        flattened: list[tuple[str, object]] = []
-        for key, value in payload.items():
-            key_str = str(key)
-            qualified_key = f"{prefix}.{key_str}" if prefix else key_str
+    if not isinstance(payload, dict):
+        return [(prefix or "value", payload)]
+    # Depth-first over a stack of item iterators keeps the original key order without recursion.
+    flattened: list[tuple[str, object]] = []
+    stack = [(prefix, iter(payload.items()))]
+    while stack:
+        parent, items = stack[-1]
+        for key, value in items:
+            qualified_key = f"{parent}.{key}" if parent else str(key)
             if isinstance(value, dict):
-                flattened.extend(_flatten_details(value, qualified_key))
-            else:
-                flattened.append((qualified_key, value))
-        return flattened
-    return [(prefix or "value", payload)]
+                stack.append((qualified_key, iter(value.items())))
+                break
+            flattened.append((qualified_key, value))
+        else:
+            stack.pop()
+    return flattened
+
+
+def _format_detail_float(value: float) -> str:
+    if value != 0 and (abs(value) >= 10000 or abs(value) < 0.001):
+        return f"{value:.6e}"
+    return f"{value:.6f}".rstrip("0").rstrip(".")
+
+
+def _format_detail_sequence(value: list | tuple | set) -> str:
+    values = list(value)
+    preview = ", ".join(_detail_value_text(item) for item in values[:5])
+    return f"{preview} ..." if len(values) > 5 else preview
+
+
+_DETAIL_FORMATTERS = {
+    type(None): lambda value: "--",
+    bool: lambda value: "Yes" if value else "No",
+    float: _format_detail_float,
+    int: str,
+    str: str,
+    list: _format_detail_sequence,
+    tuple: _format_detail_sequence,
+    set: _format_detail_sequence,
+    dict: lambda value: json.dumps(value, ensure_ascii=True),
+}
 
 
 def _detail_value_text(value: object) -> str:
-    if value is None:
-        return "--"
+    # Exact types dispatch in one lookup; subclasses such as numpy.float64 fall back to the isinstance order.
+    formatter = _DETAIL_FORMATTERS.get(type(value))
+    if formatter is not None:
+        return formatter(value)
     if isinstance(value, bool):
         return "Yes" if value else "No"
     if isinstance(value, float):
-        if value != 0 and (abs(value) >= 10000 or abs(value) < 0.001):
-            return f"{value:.6e}"
-        return f"{value:.6f}".rstrip("0").rstrip(".")
+        return _format_detail_float(value)
     if isinstance(value, (list, tuple, set)):
-        values = list(value)
-        preview = ", ".join(_detail_value_text(item) for item in values[:5])
-        return f"{preview} ..." if len(values) > 5 else preview
+        return _format_detail_sequence(value)
     if isinstance(value, dict):
         return json.dumps(value, ensure_ascii=True)
     return str(value)
@@ -440,6 +514,22 @@ def _build_calculation_summary(
     return csv_buffer.getvalue(), "\n".join(lines)
 
 
+_DETAIL_CARD_TPL = (
+    '<div class="detail-card">'
+    '<div class="detail-label">{label}</div>'
+    '<div class="detail-value">{value}</div>'
+    "</div>"
+)
+
+_ENV_HEADER_TPL = """
+<div class="env-header">
+  <div class="env-header-item"><strong>Location</strong><span>{location}</span></div>
+  <div class="env-header-item"><strong>Temperature</strong><span>{temperature}</span></div>
+  <div class="env-header-item"><strong>Pressure</strong><span>{pressure}</span></div>
+</div>
+"""
+
+
 def _render_detail_cards(payload: object, columns: int = 3) -> None:
     items = _flatten_details(payload)
     if not items:
@@ -447,41 +537,46 @@ def _render_detail_cards(payload: object, columns: int = 3) -> None:
         return
 
     column_count = max(1, columns)
-    card_columns = st.columns(column_count)
+    # One markdown element per column instead of one per card keeps the delta count at column_count.
+    buckets: list[list[str]] = [[] for _ in range(column_count)]
     for index, (label, value) in enumerate(items):
-        with card_columns[index % column_count]:
-            st.markdown(
-                f"""
-                <div class="detail-card">
-                  <div class="detail-label">{html_escape(label)}</div>
-                  <div class="detail-value">{html_escape(_detail_value_text(value))}</div>
-                </div>
-                """,
-                unsafe_allow_html=True,
+        buckets[index % column_count].append(
+            _DETAIL_CARD_TPL.format_map(
+                {"label": html_escape(label), "value": html_escape(_detail_value_text(value))}
             )
+        )
+    for column, cards in zip(st.columns(column_count), buckets):
+        if cards:
+            column.markdown("".join(cards), unsafe_allow_html=True)
 
 
-def _environment_details_for_display(details: dict) -> dict:
-    payload = dict(details)
-    payload.pop("source", None)
-    payload.pop("country_code", None)
-    placeholder_values = {
+_PLACEHOLDER_LOCATIONS = frozenset(
+    {
         "",
         "current location",
         "detecting current location...",
         "location detected",
         "unknown location",
     }
+)
+_PROVIDER_DROP = frozenset({"geolocation", "weather"})
+
+
+def _is_placeholder_location(value: object) -> bool:
+    return str(value).strip().lower() in _PLACEHOLDER_LOCATIONS
+
 
-    def _is_placeholder_location(value: object) -> bool:
-        return str(value).strip().lower() in placeholder_values
+def _environment_details_for_display(details: dict) -> dict:
+    payload = dict(details)
+    payload.pop("source", None)
+    payload.pop("country_code", None)
 
     provider = payload.get("provider")
     if isinstance(provider, dict):
         provider_filtered = {
             key: value
             for key, value in provider.items()
-            if str(key) not in {"geolocation", "weather"}
+            if str(key) not in _PROVIDER_DROP
         }
         if provider_filtered:
             payload["provider"] = provider_filtered
@@ -526,6 +621,35 @@ def _environment_details_for_display(details: dict) -> dict:
     return payload
 
 
+_ADV_CHARGE_FIELDS: tuple[tuple[str, dict[str, Any]], ...] = (
+    ("m_high", {"label": "M_high", "min_value": 0.000001, "value": 7.674, "format": "%.6f"}),
+    ("m_low", {"label": "M_low", "min_value": 0.000001, "value": 7.630, "format": "%.6f"}),
+    ("m_pos", {"label": "M_pos", "min_value": 0.000001, "value": 7.674, "format": "%.6f"}),
+    ("m_neg", {"label": "M_neg", "min_value": 0.000001, "value": 7.660, "format": "%.6f"}),
+)
+_ADV_REFERENCE_FIELDS: tuple[tuple[str, dict[str, Any]], ...] = (
+    ("p0_kpa", {"label": "Reference Pressure P0 (kPa)", "value": 101.325, "step": 0.01}),
+    ("v_high", {"label": "V_high (V)", "min_value": 1.0, "value": 300.0, "step": 1.0}),
+    ("v_low", {"label": "V_low (V)", "min_value": 1.0, "value": 150.0, "step": 1.0}),
+)
+_ADV_FACTOR_FIELDS: tuple[tuple[str, dict[str, Any]], ...] = (
+    ("k_ecal", {"label": "k_ecal", "min_value": 0.1, "value": 1.0, "step": 0.001, "format": "%.4f"}),
+    ("k_r50", {"label": "k_R50", "min_value": 0.1, "value": 1.0, "step": 0.001, "format": "%.4f"}),
+    ("p_q_gr", {"label": "P_Q_gr", "min_value": 0.1, "value": 1.0, "step": 0.001, "format": "%.4f"}),
+)
+
+
+def _number_fields(fields: tuple[tuple[str, dict[str, Any]], ...], key_prefix: str) -> list[float]:
+    return [st.number_input(**kwargs, key=f"{key_prefix}_{name}") for name, kwargs in fields]
+
+
+def _optional_number(
+    checkbox_label: str, checkbox_key: str, label: str, **number_kwargs: Any
+) -> tuple[bool, float | None]:
+    enabled = st.checkbox(checkbox_label, key=checkbox_key)
+    return enabled, st.number_input(label, **number_kwargs) if enabled else None
+
+
 _ensure_local_state()
 env_settings = get_environment_settings()
 admin_env_source = str(env_settings["env_source"])
@@ -534,8 +658,7 @@ if admin_env_source == ENV_SOURCE_MANUAL:
 if admin_env_source == ENV_SOURCE_AUTO:
     _ingest_browser_geolocation_payload()
 
-header_location, header_temp, header_pressure = _header_environment_snapshot(env_settings)
-header_status = _header_status_text(env_settings)
+header_location, header_temp, header_pressure, header_status = _memoized_header(env_settings)
 header_temp_label = f"{header_temp:.1f} C" if header_temp is not None else "--"
 header_pressure_label = f"{header_pressure:.1f} kPa" if header_pressure is not None else "--"
 
@@ -545,13 +668,13 @@ with top_left:
         st.switch_page("pages/9_Admin_Portal.py")
 with top_mid:
     st.markdown(
-        f"""
-        <div class="env-header">
-          <div class="env-header-item"><strong>Location</strong><span>{header_location}</span></div>
-          <div class="env-header-item"><strong>Temperature</strong><span>{header_temp_label}</span></div>
-          <div class="env-header-item"><strong>Pressure</strong><span>{header_pressure_label}</span></div>
-        </div>
-        """,
+        _ENV_HEADER_TPL.format_map(
+            {
+                "location": html_escape(header_location),
+                "temperature": header_temp_label,
+                "pressure": header_pressure_label,
+            }
+        ),
         unsafe_allow_html=True,
     )
     st.caption(header_status)
@@ -746,105 +869,47 @@ with protocol_tabs[0]:
                     step=0.1,
                     key="trs_t0_c",
                 )
-                m_high = st.number_input(
-                    "M_high",
-                    min_value=0.000001,
-                    value=7.674,
-                    format="%.6f",
-                    key="trs_m_high",
-                )
-                m_low = st.number_input(
-                    "M_low",
-                    min_value=0.000001,
-                    value=7.630,
-                    format="%.6f",
-                    key="trs_m_low",
-                )
-                m_pos = st.number_input(
-                    "M_pos",
+                m_high, m_low, m_pos, m_neg = _number_fields(_ADV_CHARGE_FIELDS, "trs")
+            with r2:
+                p0_kpa, v_high, v_low = _number_fields(_ADV_REFERENCE_FIELDS, "trs")
+                use_custom_m_ref, m_ref = _optional_number(
+                    "Use custom M_ref",
+                    "trs_use_custom_m_ref",
+                    "M_ref",
                     min_value=0.000001,
                     value=7.674,
                     format="%.6f",
-                    key="trs_m_pos",
-                )
-                m_neg = st.number_input(
-                    "M_neg",
-                    min_value=0.000001,
-                    value=7.660,
-                    format="%.6f",
-                    key="trs_m_neg",
-                )
-            with r2:
-                p0_kpa = st.number_input(
-                    "Reference Pressure P0 (kPa)",
-                    value=101.325,
-                    step=0.01,
-                    key="trs_p0_kpa",
-                )
-                v_high = st.number_input(
-                    "V_high (V)",
-                    min_value=1.0,
-                    value=300.0,
-                    step=1.0,
-                    key="trs_v_high",
-                )
-                v_low = st.number_input(
-                    "V_low (V)",
-                    min_value=1.0,
-                    value=150.0,
-                    step=1.0,
-                    key="trs_v_low",
-                )
-                use_custom_m_ref = st.checkbox("Use custom M_ref", key="trs_use_custom_m_ref")
-                m_ref = (
-                    st.number_input(
-                        "M_ref",
-                        min_value=0.000001,
-                        value=7.674,
-                        format="%.6f",
-                        key="trs_m_ref",
-                    )
-                    if use_custom_m_ref
-                    else None
+                    key="trs_m_ref",
                 )
 
             o1, o2 = st.columns(2)
             with o1:
-                use_manual_p_tp = st.checkbox("Manual k_TP", key="trs_use_manual_p_tp")
-                p_tp_manual = (
-                    st.number_input(
-                        "k_TP_manual",
-                        value=1.0,
-                        step=0.0001,
-                        format="%.6f",
-                        key="trs_k_tp_manual",
-                    )
-                    if use_manual_p_tp
-                    else None
+                use_manual_p_tp, p_tp_manual = _optional_number(
+                    "Manual k_TP",
+                    "trs_use_manual_p_tp",
+                    "k_TP_manual",
+                    value=1.0,
+                    step=0.0001,
+                    format="%.6f",
+                    key="trs_k_tp_manual",
                 )
-                use_manual_p_ion = st.checkbox("Manual k_s", key="trs_use_manual_p_ion")
-                p_ion_manual = (
-                    st.number_input(
-                        "k_s_manual",
-                        value=1.0,
-                        step=0.0001,
-                        format="%.6f",
-                        key="trs_k_s_manual",
-                    )
-                    if use_manual_p_ion
-                    else None
+                use_manual_p_ion, p_ion_manual = _optional_number(
+                    "Manual k_s",
+                    "trs_use_manual_p_ion",
+                    "k_s_manual",
+                    value=1.0,
+                    step=0.0001,
+                    format="%.6f",
+                    key="trs_k_s_manual",
                 )
-                use_manual_p_pol = st.checkbox("Manual k_pol", key="trs_use_manual_p_pol")
-                p_pol_manual = (
-                    st.number_input(
-                        "k_pol_manual",
-                        value=1.0,
-                        step=0.0001,
-                        format="%.6f",
-                        key="trs_k_pol_manual",
-                    )
-                    if use_manual_p_pol
-                    else None
+                use_manual_p_pol, p_pol_manual = _optional_number(
+                    "Manual k_pol",
+                    "trs_use_manual_p_pol",
+                    "k_pol_manual",
+                    value=1.0,
+                    step=0.0001,
+                    format="%.6f",
+                    key="trs_k_pol_manual",
                 )
             with o2:
                 use_advanced_kq_fitting = st.checkbox(
@@ -882,77 +947,44 @@ with protocol_tabs[0]:
                         disabled=chamber_a is None and chamber_b is None,
                     )
                 else:
-                    use_manual_k_q = st.checkbox("Manual k_Q", key="trs_use_manual_k_q")
-                    k_q_manual = (
-                        st.number_input(
-                            "Manual k_Q (overrides fitted k_Q from TPR20,10)",
-                            min_value=0.01,
-                            value=0.973,
-                            step=0.0001,
-                            format="%.6f",
-                            key="trs_k_q_manual",
-                        )
-                        if use_manual_k_q
-                        else None
+                    use_manual_k_q, k_q_manual = _optional_number(
+                        "Manual k_Q",
+                        "trs_use_manual_k_q",
+                        "Manual k_Q (overrides fitted k_Q from TPR20,10)",
+                        min_value=0.01,
+                        value=0.973,
+                        step=0.0001,
+                        format="%.6f",
+                        key="trs_k_q_manual",
                     )
 
                 if use_advanced_kq_fitting:
                     st.caption("k_Q will be fitted from TPR20,10 using chamber parameters a/b.")
 
-                use_manual_depth_factor = st.checkbox("Manual depth_factor", key="trs_use_manual_depth_factor")
-                depth_factor_manual = (
-                    st.number_input(
-                        "depth_factor_manual",
-                        value=1.0,
-                        step=0.0001,
-                        format="%.6f",
-                        key="trs_depth_factor_manual",
-                    )
-                    if use_manual_depth_factor
-                    else None
-                )
-                override_ndw = st.checkbox("Override N_Dw_60Co", key="trs_override_ndw")
-                ndw_override = (
-                    st.number_input(
-                        "N_Dw_60Co",
-                        min_value=0.0,
-                        value=5.233e7,
-                        format="%.8e",
-                        key="trs_ndw_override",
-                    )
-                    if override_ndw
-                    else None
-                )
-
-            e1, e2, e3 = st.columns(3)
-            with e1:
-                k_ecal = st.number_input(
-                    "k_ecal",
-                    min_value=0.1,
+                use_manual_depth_factor, depth_factor_manual = _optional_number(
+                    "Manual depth_factor",
+                    "trs_use_manual_depth_factor",
+                    "depth_factor_manual",
                     value=1.0,
-                    step=0.001,
-                    format="%.4f",
-                    key="trs_k_ecal",
+                    step=0.0001,
+                    format="%.6f",
+                    key="trs_depth_factor_manual",
                 )
-            with e2:
-                k_r50 = st.number_input(
-                    "k_R50",
-                    min_value=0.1,
-                    value=1.0,
-                    step=0.001,
-                    format="%.4f",
-                    key="trs_k_r50",
-                )
-            with e3:
-                p_q_gr = st.number_input(
-                    "P_Q_gr",
-                    min_value=0.1,
-                    value=1.0,
-                    step=0.001,
-                    format="%.4f",
-                    key="trs_p_q_gr",
+                override_ndw, ndw_override = _optional_number(
+                    "Override N_Dw_60Co",
+                    "trs_override_ndw",
+                    "N_Dw_60Co",
+                    min_value=0.0,
+                    value=5.233e7,
+                    format="%.8e",
+                    key="trs_ndw_override",
                 )
 
+            k_ecal, k_r50, p_q_gr = (
+                column.number_input(**kwargs, key=f"trs_{name}")
+                for column, (name, kwargs) in zip(st.columns(3), _ADV_FACTOR_FIELDS)
+            )
+
         btn_col1, btn_col2 = st.columns(2)
         with btn_col1:
             submitted_trs398 = st.button(
@@ -1120,6 +1152,7 @@ with protocol_tabs[0]:
                 formula_version=result["formula_version"],
                 dataset_versions=result["dataset_versions"],
             )
+            cached_list_run_summaries.clear()
 
             st.success("Calculation complete.")
 
@@ -1307,173 +1340,82 @@ with protocol_tabs[1]:
                 t0_c = st.number_input(
                     "Reference Temperature T0 (C)", value=20.0, step=0.1, key="tg51_t0_c"
                 )
-                m_high = st.number_input(
-                    "M_high",
-                    min_value=0.000001,
-                    value=7.674,
-                    format="%.6f",
-                    key="tg51_m_high",
-                )
-                m_low = st.number_input(
-                    "M_low",
-                    min_value=0.000001,
-                    value=7.630,
-                    format="%.6f",
-                    key="tg51_m_low",
-                )
-                m_pos = st.number_input(
-                    "M_pos",
+                m_high, m_low, m_pos, m_neg = _number_fields(_ADV_CHARGE_FIELDS, "tg51")
+            with r2:
+                p0_kpa, v_high, v_low = _number_fields(_ADV_REFERENCE_FIELDS, "tg51")
+                use_custom_m_ref, m_ref = _optional_number(
+                    "Use custom M_ref",
+                    "tg51_use_custom_m_ref",
+                    "M_ref",
                     min_value=0.000001,
                     value=7.674,
                     format="%.6f",
-                    key="tg51_m_pos",
-                )
-                m_neg = st.number_input(
-                    "M_neg",
-                    min_value=0.000001,
-                    value=7.660,
-                    format="%.6f",
-                    key="tg51_m_neg",
-                )
-            with r2:
-                p0_kpa = st.number_input(
-                    "Reference Pressure P0 (kPa)",
-                    value=101.325,
-                    step=0.01,
-                    key="tg51_p0_kpa",
-                )
-                v_high = st.number_input(
-                    "V_high (V)",
-                    min_value=1.0,
-                    value=300.0,
-                    step=1.0,
-                    key="tg51_v_high",
-                )
-                v_low = st.number_input(
-                    "V_low (V)",
-                    min_value=1.0,
-                    value=150.0,
-                    step=1.0,
-                    key="tg51_v_low",
-                )
-                use_custom_m_ref = st.checkbox("Use custom M_ref", key="tg51_use_custom_m_ref")
-                m_ref = (
-                    st.number_input(
-                        "M_ref",
-                        min_value=0.000001,
-                        value=7.674,
-                        format="%.6f",
-                        key="tg51_m_ref",
-                    )
-                    if use_custom_m_ref
-                    else None
+                    key="tg51_m_ref",
                 )
 
             o1, o2 = st.columns(2)
             with o1:
-                use_manual_p_tp = st.checkbox("Manual P_TP", key="tg51_use_manual_p_tp")
-                p_tp_manual = (
-                    st.number_input(
-                        "P_TP_manual",
-                        value=1.0,
-                        step=0.0001,
-                        format="%.6f",
-                        key="tg51_p_tp_manual",
-                    )
-                    if use_manual_p_tp
-                    else None
+                use_manual_p_tp, p_tp_manual = _optional_number(
+                    "Manual P_TP",
+                    "tg51_use_manual_p_tp",
+                    "P_TP_manual",
+                    value=1.0,
+                    step=0.0001,
+                    format="%.6f",
+                    key="tg51_p_tp_manual",
                 )
-                use_manual_p_ion = st.checkbox("Manual P_ion", key="tg51_use_manual_p_ion")
-                p_ion_manual = (
-                    st.number_input(
-                        "P_ion_manual",
-                        value=1.0,
-                        step=0.0001,
-                        format="%.6f",
-                        key="tg51_p_ion_manual",
-                    )
-                    if use_manual_p_ion
-                    else None
+                use_manual_p_ion, p_ion_manual = _optional_number(
+                    "Manual P_ion",
+                    "tg51_use_manual_p_ion",
+                    "P_ion_manual",
+                    value=1.0,
+                    step=0.0001,
+                    format="%.6f",
+                    key="tg51_p_ion_manual",
                 )
-                use_manual_p_pol = st.checkbox("Manual P_pol", key="tg51_use_manual_p_pol")
-                p_pol_manual = (
-                    st.number_input(
-                        "P_pol_manual",
-                        value=1.0,
-                        step=0.0001,
-                        format="%.6f",
-                        key="tg51_p_pol_manual",
-                    )
-                    if use_manual_p_pol
-                    else None
+                use_manual_p_pol, p_pol_manual = _optional_number(
+                    "Manual P_pol",
+                    "tg51_use_manual_p_pol",
+                    "P_pol_manual",
+                    value=1.0,
+                    step=0.0001,
+                    format="%.6f",
+                    key="tg51_p_pol_manual",
                 )
             with o2:
-                use_manual_k_q = st.checkbox("Manual k_Q", key="tg51_use_manual_k_q")
-                k_q_manual = (
-                    st.number_input(
-                        "k_Q_manual",
-                        value=0.973,
-                        step=0.0001,
-                        format="%.6f",
-                        key="tg51_k_q_manual",
-                    )
-                    if use_manual_k_q
-                    else None
-                )
-                use_manual_depth_factor = st.checkbox("Manual depth_factor", key="tg51_use_manual_depth_factor")
-                depth_factor_manual = (
-                    st.number_input(
-                        "depth_factor_manual",
-                        value=1.0,
-                        step=0.0001,
-                        format="%.6f",
-                        key="tg51_depth_factor_manual",
-                    )
-                    if use_manual_depth_factor
-                    else None
-                )
-                override_ndw = st.checkbox("Override N_Dw_60Co", key="tg51_override_ndw")
-                ndw_override = (
-                    st.number_input(
-                        "N_Dw_60Co",
-                        min_value=0.0,
-                        value=5.233e7,
-                        format="%.8e",
-                        key="tg51_ndw_override",
-                    )
-                    if override_ndw
-                    else None
-                )
-
-            e1, e2, e3 = st.columns(3)
-            with e1:
-                k_ecal = st.number_input(
-                    "k_ecal",
-                    min_value=0.1,
-                    value=1.0,
-                    step=0.001,
-                    format="%.4f",
-                    key="tg51_k_ecal",
+                use_manual_k_q, k_q_manual = _optional_number(
+                    "Manual k_Q",
+                    "tg51_use_manual_k_q",
+                    "k_Q_manual",
+                    value=0.973,
+                    step=0.0001,
+                    format="%.6f",
+                    key="tg51_k_q_manual",
                 )
-            with e2:
-                k_r50 = st.number_input(
-                    "k_R50",
-                    min_value=0.1,
+                use_manual_depth_factor, depth_factor_manual = _optional_number(
+                    "Manual depth_factor",
+                    "tg51_use_manual_depth_factor",
+                    "depth_factor_manual",
                     value=1.0,
-                    step=0.001,
-                    format="%.4f",
-                    key="tg51_k_r50",
+                    step=0.0001,
+                    format="%.6f",
+                    key="tg51_depth_factor_manual",
                 )
-            with e3:
-                p_q_gr = st.number_input(
-                    "P_Q_gr",
-                    min_value=0.1,
-                    value=1.0,
-                    step=0.001,
-                    format="%.4f",
-                    key="tg51_p_q_gr",
+                override_ndw, ndw_override = _optional_number(
+                    "Override N_Dw_60Co",
+                    "tg51_override_ndw",
+                    "N_Dw_60Co",
+                    min_value=0.0,
+                    value=5.233e7,
+                    format="%.8e",
+                    key="tg51_ndw_override",
                 )
 
+            k_ecal, k_r50, p_q_gr = (
+                column.number_input(**kwargs, key=f"tg51_{name}")
+                for column, (name, kwargs) in zip(st.columns(3), _ADV_FACTOR_FIELDS)
+            )
+
         btn_col1, btn_col2 = st.columns(2)
         with btn_col1:
             submitted_tg51 = st.form_submit_button("Calculate Dose", type="primary", use_container_width=True)
@@ -1614,6 +1556,7 @@ with protocol_tabs[1]:
                 formula_version=result["formula_version"],
                 dataset_versions=result["dataset_versions"],
             )
+            cached_list_run_summaries.clear()
 
             st.success("Calculation complete.")
 
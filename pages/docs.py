@@ -1,7 +1,7 @@
 import streamlit as st
 
 from dosimetry_app.bootstrap import initialize_application
-from dosimetry_app.settings import ENV_SOURCE_AUTO, ENV_SOURCE_DATASET, get_environment_settings
+from dosimetry_app.listings import cached_environment_source_label
 from dosimetry_app.theme import apply_theme
 from dosimetry_app.ui import init_session_state
 
@@ -9,261 +9,262 @@ initialize_application()
 apply_theme()
 init_session_state()
 
-st.markdown(
-    """
+_HERO_HTML = """
     <div class="hero-box">
       <div class="hero-title">User Guide</div>
       <div class="hero-subtitle">
         Simple, complete instructions for using the Universal Absorbed Calculation System.
       </div>
     </div>
-    """,
-    unsafe_allow_html=True,
+    """
+_SECTION_CAPTION = "Use the section picker below to quickly jump to the section you need."
+_FOOTER_CAPTION = "Guide route: `/docs` | You can return to calculator anytime using the top button."
+
+# Static copy is one markdown element per tab section; each st.markdown call is a separate frontend element.
+_QUICK_START_INTRO_MD = """
+### What This System Does
+
+- This system helps you calculate absorbed dose using a guided calculator form.
+- The calculator page is public and opens first.
+- The admin portal is login-protected and is used to manage data/settings.
+- Temperature and pressure are fetched automatically and used in calculations.
+"""
+
+_QUICK_START_MD = """
+### 3-Minute Quick Start
+
+1. Open the calculator page.
+2. Allow location permission in your browser if prompted.
+3. Fill required calculator fields.
+4. Click `Calculate Dose`.
+5. Read the result cards and optional details.
+
+### Who Should Use Which Page
+
+- `Calculator`: for all users who need to perform calculations.
+- `Admin Portal`: for admins/physicists managing datasets and formulas.
+- `Guide (/docs)`: this page, for instructions and support.
+"""
+
+_CALCULATOR_STEPS_MD = """
+### Step-by-Step: Using the Calculator
+
+1. Open the calculator landing page.
+2. Confirm the header shows location, temperature, and pressure.
+3. If needed, press `Use My Location` to refresh live data.
+4. Fill in Core Inputs.
+5. Open Advanced Inputs only if your workflow requires them.
+6. Press `Calculate Dose`.
+7. Review:
+   - Dose per measurement (Gy)
+   - Dose per 100 MU (Gy)
+   - Optional detail sections under `Show Calculation Details`
+
+### Before You Calculate
+
+- Make sure the correct chamber type is selected.
+- Confirm all numeric inputs are in the expected units.
+- If calculation fails, check the error message and fix the highlighted issue.
+
+### Mobile-Friendly Usage Tips
+
+- Scroll section by section and complete fields from top to bottom.
+- Use the `Calculate Dose` button at the bottom of the form.
+- Expand advanced sections only when necessary to reduce clutter.
+"""
+
+_FIELD_GUIDE_MD = """
+### Core Fields (Simple Meaning)
+
+- `Beam Type`: choose photon or electron.
+- `Chamber Type`: choose the chamber you are using.
+- `Geometry Mode`: choose SSD or SAD based on your setup.
+- `Reading Unit`: unit of your measured reading.
+- `Energy (MV)`: beam energy.
+- `Field Size (cm)`: treatment field size.
+- `Depth (cm)`: measurement depth.
+- `Reference Depth (cm)`: depth used as reference point.
+- `Beam Quality Metric`: quality value used to select correction factors.
+- `Raw Reading`: uncorrected measured reading.
+- `MU Measured`: monitor units used during measurement.
+- `P_elec`: electrometer correction factor.
+
+### Advanced Fields (Use Only If Needed)
+
+- Advanced options are for detailed QA/special protocols.
+- If you are unsure, leave advanced values at their defaults.
+- Manual overrides should be used only when validated by your team workflow.
+
+### Temperature and Pressure
+
+- You do not type these manually on calculator.
+- The system fetches them automatically from live source or dataset source.
+- Current values are shown in the top header.
+"""
+
+_RESULTS_MD = """
+### Result Cards
+
+- `Dose / measurement (Gy)`: computed dose for the entered measurement.
+- `Dose / 100 MU (Gy)`: normalized dose output for 100 MU.
+
+### Calculation Details Section
+
+- `Formula Expression`: formula used for this run.
+- `Intermediate Values`: internal correction and support values.
+- `Environment Used`: location, temperature, pressure used for this run.
+- `Dataset Versions`: active data versions used when calculation ran.
+
+### How to Confirm Result Quality
+
+- Verify chamber type, energy, depth, and field size were entered correctly.
+- Confirm header location/temperature/pressure are correct.
+- Re-run calculation after any correction and compare outputs.
+"""
+
+_ADMIN_MD = """
+### Admin Access and Roles
+
+- `Admin / Physicist`: can manage environment, datasets, formulas, and run history.
+- `Viewer`: can review overview and run history.
+
+### Admin Workflow (Recommended Order)
+
+1. Environment tab:
+   - choose `Auto` or `Dataset` source for temperature/pressure.
+2. Datasets tab:
+   - upload datasets, review validation, activate correct version.
+3. Formulas tab:
+   - create/test formulas, then activate approved version.
+4. Run History tab:
+   - review run records, inspect detailed payloads for audits.
+
+### Required Dataset Columns
+
+- `kq_table`: `chamber_type, beam_quality, kq`
+- `pdd_table`: `energy_mv, field_size_cm, depth_cm, value`
+- `tpr_table`: `energy_mv, field_size_cm, depth_cm, value`
+- `chamber_defaults`: `chamber_type, ndw_60co, rcav_cm, reference_polarity`
+- `environmental_data`: `location, temperature_c, pressure_kpa`
+"""
+
+
+_TROUBLESHOOTING = (
+    (
+        "Location is not updating",
+        """1. Confirm browser location permission is allowed for this app.
+2. Press `Use My Location` again.
+3. If previously denied, re-enable location access in browser site settings.""",
+    ),
+    (
+        "Weather data could not be refreshed",
+        """1. Retry after a short wait (temporary network/provider issue).
+2. Ask admin to switch Environment source to `Dataset`.
+3. Confirm internet connectivity on the host running the app.""",
+    ),
+    (
+        "Calculation failed",
+        """1. Confirm required datasets are uploaded and active.
+2. Confirm an active formula exists for selected beam type.
+3. Check your input values and units for mistakes.""",
+    ),
+    (
+        "Admin login does not work",
+        """1. Re-check username and password.
+2. If credentials were changed, use the current deployed credentials.""",
+    ),
 )
 
-nav_left, nav_right = st.columns(2)
-with nav_left:
-    if st.button("Back to Calculator", key="docs_back_calculator", use_container_width=True):
-        st.switch_page("pages/1_Calculator.py")
-with nav_right:
-    if st.button("Open Admin Portal", key="docs_open_admin", use_container_width=True):
-        st.switch_page("pages/9_Admin_Portal.py")
-
-st.caption("Use the tabs below to quickly jump to the section you need.")
-
-tab_quick_start, tab_calculator_steps, tab_field_guide, tab_results, tab_admin, tab_troubleshooting, tab_faq = st.tabs(
-    [
-        "Quick Start",
-        "Calculator Steps",
-        "Fields Explained",
-        "Understanding Results",
-        "Admin Guide",
-        "Troubleshooting",
-        "FAQ",
-    ]
+_FAQ = (
+    ("Do I need to sign in to calculate dose?", "No. The calculator is public and does not require login."),
+    (
+        "Do I need to enter temperature and pressure manually?",
+        "No. The system fetches these automatically and applies them during calculation.",
+    ),
+    (
+        "When should I use Advanced Inputs?",
+        "Use them only when your protocol specifically requires overrides or extra correction controls.",
+    ),
+    (
+        "Can I trust old data versions after updates?",
+        "Each run stores formula and dataset versions used, so historical runs remain traceable.",
+    ),
 )
 
-with tab_quick_start:
-    st.markdown("### What This System Does")
-    st.markdown(
-        """
-        - This system helps you calculate absorbed dose using a guided calculator form.
-        - The calculator page is public and opens first.
-        - The admin portal is login-protected and is used to manage data/settings.
-        - Temperature and pressure are fetched automatically and used in calculations.
-        """
-    )
 
-    env_settings = get_environment_settings()
-    env_source = str(env_settings.get("env_source", ""))
-    env_source_label = "Auto (IP + Weather API)" if env_source == ENV_SOURCE_AUTO else "Dataset"
-    if env_source not in {ENV_SOURCE_AUTO, ENV_SOURCE_DATASET}:
-        env_source_label = env_source or "Unknown"
-    st.info(f"Current temperature/pressure source: `{env_source_label}`")
-
-    st.markdown("### 3-Minute Quick Start")
-    st.markdown(
-        """
-        1. Open the calculator page.
-        2. Allow location permission in your browser if prompted.
-        3. Fill required calculator fields.
-        4. Click `Calculate Dose`.
-        5. Read the result cards and optional details.
-        """
-    )
+def _render_quick_start() -> None:
+    st.markdown(_QUICK_START_INTRO_MD)
+    st.info(f"Current temperature/pressure source: `{cached_environment_source_label()}`")
 
-    st.markdown("### Who Should Use Which Page")
-    st.markdown(
-        """
-        - `Calculator`: for all users who need to perform calculations.
-        - `Admin Portal`: for admins/physicists managing datasets and formulas.
-        - `Guide (/docs)`: this page, for instructions and support.
-        """
-    )
+    st.markdown(_QUICK_START_MD)
 
-with tab_calculator_steps:
-    st.markdown("### Step-by-Step: Using the Calculator")
-    st.markdown(
-        """
-        1. Open the calculator landing page.
-        2. Confirm the header shows location, temperature, and pressure.
-        3. If needed, press `Use My Location` to refresh live data.
-        4. Fill in Core Inputs.
-        5. Open Advanced Inputs only if your workflow requires them.
-        6. Press `Calculate Dose`.
-        7. Review:
-           - Dose per measurement (Gy)
-           - Dose per 100 MU (Gy)
-           - Optional detail sections under `Show Calculation Details`
-        """
-    )
 
-    st.markdown("### Before You Calculate")
-    st.markdown(
-        """
-        - Make sure the correct chamber type is selected.
-        - Confirm all numeric inputs are in the expected units.
-        - If calculation fails, check the error message and fix the highlighted issue.
-        """
-    )
+def _render_calculator_steps() -> None:
+    st.markdown(_CALCULATOR_STEPS_MD)
 
-    st.markdown("### Mobile-Friendly Usage Tips")
-    st.markdown(
-        """
-        - Scroll section by section and complete fields from top to bottom.
-        - Use the `Calculate Dose` button at the bottom of the form.
-        - Expand advanced sections only when necessary to reduce clutter.
-        """
-    )
 
-with tab_field_guide:
-    st.markdown("### Core Fields (Simple Meaning)")
-    st.markdown(
-        """
-        - `Beam Type`: choose photon or electron.
-        - `Chamber Type`: choose the chamber you are using.
-        - `Geometry Mode`: choose SSD or SAD based on your setup.
-        - `Reading Unit`: unit of your measured reading.
-        - `Energy (MV)`: beam energy.
-        - `Field Size (cm)`: treatment field size.
-        - `Depth (cm)`: measurement depth.
-        - `Reference Depth (cm)`: depth used as reference point.
-        - `Beam Quality Metric`: quality value used to select correction factors.
-        - `Raw Reading`: uncorrected measured reading.
-        - `MU Measured`: monitor units used during measurement.
-        - `P_elec`: electrometer correction factor.
-        """
-    )
+def _render_field_guide() -> None:
+    st.markdown(_FIELD_GUIDE_MD)
 
-    st.markdown("### Advanced Fields (Use Only If Needed)")
-    st.markdown(
-        """
-        - Advanced options are for detailed QA/special protocols.
-        - If you are unsure, leave advanced values at their defaults.
-        - Manual overrides should be used only when validated by your team workflow.
-        """
-    )
 
-    st.markdown("### Temperature and Pressure")
-    st.markdown(
-        """
-        - You do not type these manually on calculator.
-        - The system fetches them automatically from live source or dataset source.
-        - Current values are shown in the top header.
-        """
-    )
+def _render_results() -> None:
+    st.markdown(_RESULTS_MD)
 
-with tab_results:
-    st.markdown("### Result Cards")
-    st.markdown(
-        """
-        - `Dose / measurement (Gy)`: computed dose for the entered measurement.
-        - `Dose / 100 MU (Gy)`: normalized dose output for 100 MU.
-        """
-    )
 
-    st.markdown("### Calculation Details Section")
-    st.markdown(
-        """
-        - `Formula Expression`: formula used for this run.
-        - `Intermediate Values`: internal correction and support values.
-        - `Environment Used`: location, temperature, pressure used for this run.
-        - `Dataset Versions`: active data versions used when calculation ran.
-        """
-    )
+def _render_admin_guide() -> None:
+    st.markdown(_ADMIN_MD)
 
-    st.markdown("### How to Confirm Result Quality")
-    st.markdown(
-        """
-        - Verify chamber type, energy, depth, and field size were entered correctly.
-        - Confirm header location/temperature/pressure are correct.
-        - Re-run calculation after any correction and compare outputs.
-        """
-    )
 
-with tab_admin:
-    st.markdown("### Admin Access and Roles")
-    st.markdown(
-        """
-        - `Admin / Physicist`: can manage environment, datasets, formulas, and run history.
-        - `Viewer`: can review overview and run history.
-        """
+def _disclosure_html(items: tuple[tuple[str, str], ...]) -> str:
+    # Native <details> blocks: one markdown element per section instead of an expander plus markdown per item.
+    return "".join(
+        f'<details class="docs-disclosure"><summary>{title}</summary>\n\n{body}\n\n</details>\n\n'
+        for title, body in items
     )
 
-    st.markdown("### Admin Workflow (Recommended Order)")
-    st.markdown(
-        """
-        1. Environment tab:
-           - choose `Auto` or `Dataset` source for temperature/pressure.
-        2. Datasets tab:
-           - upload datasets, review validation, activate correct version.
-        3. Formulas tab:
-           - create/test formulas, then activate approved version.
-        4. Run History tab:
-           - review run records, inspect detailed payloads for audits.
-        """
-    )
 
-    st.markdown("### Required Dataset Columns")
-    st.markdown(
-        """
-        - `kq_table`: `chamber_type, beam_quality, kq`
-        - `pdd_table`: `energy_mv, field_size_cm, depth_cm, value`
-        - `tpr_table`: `energy_mv, field_size_cm, depth_cm, value`
-        - `chamber_defaults`: `chamber_type, ndw_60co, rcav_cm, reference_polarity`
-        - `environmental_data`: `location, temperature_c, pressure_kpa`
-        """
-    )
+_TROUBLESHOOTING_HTML = "### Common Problems and Fixes\n\n" + _disclosure_html(_TROUBLESHOOTING)
+_FAQ_HTML = "### Frequently Asked Questions\n\n" + _disclosure_html(_FAQ)
+
+
+def _render_troubleshooting() -> None:
+    st.markdown(_TROUBLESHOOTING_HTML, unsafe_allow_html=True)
+
+
+def _render_faq() -> None:
+    st.markdown(_FAQ_HTML, unsafe_allow_html=True)
+
+
+_DOCS_SECTIONS = {
+    "Quick Start": _render_quick_start,
+    "Calculator Steps": _render_calculator_steps,
+    "Fields Explained": _render_field_guide,
+    "Understanding Results": _render_results,
+    "Admin Guide": _render_admin_guide,
+    "Troubleshooting": _render_troubleshooting,
+    "FAQ": _render_faq,
+}
+
+
+st.markdown(_HERO_HTML, unsafe_allow_html=True)
+
+# Page links navigate client-side, like render_admin_nav, so the nav row holds no widget state.
+nav_left, nav_right = st.columns(2)
+with nav_left:
+    st.page_link("pages/1_Calculator.py", label="Back to Calculator", use_container_width=True)
+with nav_right:
+    st.page_link("pages/9_Admin_Portal.py", label="Open Admin Portal", use_container_width=True)
+
+st.caption(_SECTION_CAPTION)
+
+# Unlike st.tabs, a radio only runs the selected section's body, so hidden sections emit no elements.
+section = st.radio(
+    "Section",
+    list(_DOCS_SECTIONS),
+    horizontal=True,
+    label_visibility="collapsed",
+    key="docs_section",
+)
+_DOCS_SECTIONS[section]()
 
-with tab_troubleshooting:
-    st.markdown("### Common Problems and Fixes")
-    with st.expander("Location is not updating"):
-        st.markdown(
-            """
-            1. Confirm browser location permission is allowed for this app.
-            2. Press `Use My Location` again.
-            3. If previously denied, re-enable location access in browser site settings.
-            """
-        )
-    with st.expander("Weather data could not be refreshed"):
-        st.markdown(
-            """
-            1. Retry after a short wait (temporary network/provider issue).
-            2. Ask admin to switch Environment source to `Dataset`.
-            3. Confirm internet connectivity on the host running the app.
-            """
-        )
-    with st.expander("Calculation failed"):
-        st.markdown(
-            """
-            1. Confirm required datasets are uploaded and active.
-            2. Confirm an active formula exists for selected beam type.
-            3. Check your input values and units for mistakes.
-            """
-        )
-    with st.expander("Admin login does not work"):
-        st.markdown(
-            """
-            1. Re-check username and password.
-            2. If credentials were changed, use the current deployed credentials.
-            """
-        )
-
-with tab_faq:
-    st.markdown("### Frequently Asked Questions")
-    with st.expander("Do I need to sign in to calculate dose?"):
-        st.markdown("No. The calculator is public and does not require login.")
-    with st.expander("Do I need to enter temperature and pressure manually?"):
-        st.markdown(
-            "No. The system fetches these automatically and applies them during calculation."
-        )
-    with st.expander("When should I use Advanced Inputs?"):
-        st.markdown(
-            "Use them only when your protocol specifically requires overrides or extra correction controls."
-        )
-    with st.expander("Can I trust old data versions after updates?"):
-        st.markdown(
-            "Each run stores formula and dataset versions used, so historical runs remain traceable."
-        )
-
-st.caption("Guide route: `/docs` | You can return to calculator anytime using the top button.")
+st.caption(_FOOTER_CAPTION)
@@ -0,0 +1,35 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from dosimetry_app import bootstrap, database, datasets
+from dosimetry_app.bootstrap import initialize_application
+from dosimetry_app.database import close_connection
+from dosimetry_app.settings import _invalidate_settings_cache
+
+
+def use_temp_data_dir(test_class: type[unittest.TestCase]) -> None:
+    # Called from setUpClass: the class bootstraps its own database and upload dir, so tests never write to data/.
+    temp_dir = tempfile.TemporaryDirectory()
+    test_class.addClassCleanup(temp_dir.cleanup)
+
+    data_dir = Path(temp_dir.name)
+    upload_dir = data_dir / "uploads"
+    for patcher in (
+        # The bootstrap flag is restored too, so a later class bootstraps the real database if it needs it.
+        patch.object(bootstrap, "_BOOTSTRAPPED", False),
+        patch.object(database, "DB_PATH", data_dir / "app.db"),
+        patch.object(bootstrap, "DATA_DIR", data_dir),
+        patch.object(bootstrap, "UPLOAD_DIR", upload_dir),
+        patch.object(datasets, "UPLOAD_DIR", upload_dir),
+    ):
+        patcher.start()
+        test_class.addClassCleanup(patcher.stop)
+
+    # Cleanups run last-in first-out: the connection closes before the paths are restored and the dir is removed.
+    test_class.addClassCleanup(_invalidate_settings_cache)
+    test_class.addClassCleanup(close_connection)
+    close_connection()
+    _invalidate_settings_cache()
+    initialize_application()
@@ -3,55 +3,117 @@ import unittest
 from unittest.mock import patch
 
 from dosimetry_app.auth import (
+    _VERIFIED_CREDENTIAL_CACHE,
     DEFAULT_ADMIN_PASSWORD,
     DEFAULT_ADMIN_USERNAME,
+    _verify_password_cached,
+    ensure_default_admin,
     get_bootstrap_admin_credentials,
 )
+from dosimetry_app.bootstrap import initialize_application
+from dosimetry_app.security import hash_password, hash_password_scrypt, needs_rehash, verify_password
+from tests.isolation import use_temp_data_dir
 
 
 class AuthConfigTests(unittest.TestCase):
+    ENV_KEYS = ("DOSIMETRY_ADMIN_USERNAME", "DOSIMETRY_ADMIN_PASSWORD")
+
+    def setUp(self):
+        # Only the two credential variables are sandboxed; tests set the ones they need.
+        saved = {key: os.environ.pop(key, None) for key in self.ENV_KEYS}
+        self.addCleanup(self._restore_env, saved)
+        self.secrets: dict[str, str] = {}
+        patcher = patch("dosimetry_app.auth._read_streamlit_secret", side_effect=self.secrets.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _restore_env(saved: dict[str, str | None]) -> None:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
     def test_defaults_used_when_no_env_or_secrets(self):
-        with patch.dict(os.environ, {}, clear=False):
-            os.environ.pop("DOSIMETRY_ADMIN_USERNAME", None)
-            os.environ.pop("DOSIMETRY_ADMIN_PASSWORD", None)
-            with patch("dosimetry_app.auth._read_streamlit_secret", return_value=None):
-                username, password = get_bootstrap_admin_credentials()
+        username, password = get_bootstrap_admin_credentials()
 
         self.assertEqual(username, DEFAULT_ADMIN_USERNAME)
         self.assertEqual(password, DEFAULT_ADMIN_PASSWORD)
 
     def test_env_overrides_defaults(self):
-        with patch.dict(
-            os.environ,
-            {
-                "DOSIMETRY_ADMIN_USERNAME": "cloud_admin",
-                "DOSIMETRY_ADMIN_PASSWORD": "cloud_password",
-            },
-            clear=False,
-        ):
-            with patch("dosimetry_app.auth._read_streamlit_secret", return_value=None):
-                username, password = get_bootstrap_admin_credentials()
+        os.environ["DOSIMETRY_ADMIN_USERNAME"] = "cloud_admin"
+        os.environ["DOSIMETRY_ADMIN_PASSWORD"] = "cloud_password"
+        username, password = get_bootstrap_admin_credentials()
 
         self.assertEqual(username, "cloud_admin")
         self.assertEqual(password, "cloud_password")
 
     def test_streamlit_secrets_used_when_env_missing(self):
-        secrets = {
-            "admin_username": "secret_admin",
-            "admin_password": "secret_password",
-        }
-        with patch.dict(os.environ, {}, clear=False):
-            os.environ.pop("DOSIMETRY_ADMIN_USERNAME", None)
-            os.environ.pop("DOSIMETRY_ADMIN_PASSWORD", None)
-            with patch(
-                "dosimetry_app.auth._read_streamlit_secret",
-                side_effect=lambda key: secrets.get(key),
-            ):
-                username, password = get_bootstrap_admin_credentials()
+        self.secrets.update(admin_username="secret_admin", admin_password="secret_password")
+        username, password = get_bootstrap_admin_credentials()
 
         self.assertEqual(username, "secret_admin")
         self.assertEqual(password, "secret_password")
 
 
+class CredentialCacheTests(unittest.TestCase):
+    def setUp(self):
+        _VERIFIED_CREDENTIAL_CACHE.clear()
+        self.stored_hash = hash_password("secret")
+
+    def test_repeat_verification_skips_key_derivation(self):
+        with patch("dosimetry_app.auth.verify_password", return_value=True) as mock_verify:
+            self.assertTrue(_verify_password_cached("secret", self.stored_hash))
+            self.assertTrue(_verify_password_cached("secret", self.stored_hash))
+        self.assertEqual(mock_verify.call_count, 1)
+
+    def test_wrong_password_is_never_cached(self):
+        self.assertTrue(_verify_password_cached("secret", self.stored_hash))
+        self.assertFalse(_verify_password_cached("wrong", self.stored_hash))
+        self.assertFalse(_verify_password_cached("secret", hash_password("rotated")))
+
+
+class PasswordSchemeTests(unittest.TestCase):
+    def test_scrypt_hashes_verify_alongside_pbkdf2(self):
+        scrypt_hash = hash_password_scrypt("secret")
+        self.assertTrue(scrypt_hash.startswith("scrypt$"))
+        self.assertTrue(verify_password("secret", scrypt_hash))
+        self.assertFalse(verify_password("wrong", scrypt_hash))
+        self.assertTrue(verify_password("secret", hash_password("secret")))
+
+    def test_scheme_switch_marks_other_scheme_for_rehash(self):
+        pbkdf2_hash = hash_password("secret")
+        scrypt_hash = hash_password_scrypt("secret")
+        self.assertTrue(needs_rehash(scrypt_hash))
+        with patch("dosimetry_app.security.PASSWORD_SCHEME", "scrypt"):
+            self.assertTrue(needs_rehash(pbkdf2_hash))
+            self.assertFalse(needs_rehash(scrypt_hash))
+
+
+class DefaultAdminTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        use_temp_data_dir(cls)
+
+    def test_existing_admin_is_not_rehashed(self):
+        initialize_application()
+        with patch("dosimetry_app.auth.hash_password") as mock_hash:
+            ensure_default_admin()
+        mock_hash.assert_not_called()
+
+    def test_missing_admin_is_hashed_once(self):
+        initialize_application()
+        with patch(
+            "dosimetry_app.auth.get_bootstrap_admin_credentials",
+            return_value=("bootstrap_probe_admin", "probe_password"),
+        ), patch("dosimetry_app.auth.execute") as mock_execute, patch(
+            "dosimetry_app.auth.hash_password", return_value="hashed"
+        ) as mock_hash:
+            ensure_default_admin()
+        mock_hash.assert_called_once_with("probe_password")
+        mock_execute.assert_called_once()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from unittest.mock import patch
+
+from dosimetry_app.bootstrap import initialize_application
+from tests.isolation import use_temp_data_dir
+
+
+class BootstrapTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        use_temp_data_dir(cls)
+
+    def test_initialize_application_runs_once_per_process(self):
+        initialize_application()
+        with patch("dosimetry_app.bootstrap.init_db") as mock_init_db:
+            initialize_application()
+            initialize_application()
+        mock_init_db.assert_not_called()
+
+    def test_force_reruns_bootstrap(self):
+        initialize_application()
+        with patch("dosimetry_app.bootstrap.init_db") as mock_init_db:
+            initialize_application(force=True)
+        mock_init_db.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
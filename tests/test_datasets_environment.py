@@ -1,12 +1,26 @@
+import tempfile
 import unittest
+from pathlib import Path
+from unittest import mock
 
-from dosimetry_app.bootstrap import initialize_application
-from dosimetry_app.datasets import get_environment_from_dataset, list_environment_locations
+from dosimetry_app.datasets import (
+    ensure_africa_environment_dataset,
+    get_active_dataset,
+    get_active_dataset_metadata,
+    get_environment_from_dataset,
+    import_dataset_from_path,
+    list_datasets,
+    list_eligible_datasets,
+    list_environment_locations,
+    load_dataset_frame,
+)
+from tests.isolation import use_temp_data_dir
 
 
 class DatasetEnvironmentTests(unittest.TestCase):
-    def setUp(self):
-        initialize_application()
+    @classmethod
+    def setUpClass(cls):
+        use_temp_data_dir(cls)
 
     def test_harare_is_prioritized_in_location_list(self):
         locations = list_environment_locations()
@@ -20,6 +34,56 @@ class DatasetEnvironmentTests(unittest.TestCase):
         nairobi = get_environment_from_dataset("NAIROBI")
         self.assertEqual(nairobi["location"], "Nairobi, Kenya")
 
+    def test_active_dataset_is_parsed_once_per_checksum(self):
+        get_active_dataset("environmental_data")
+        # Both loaders are patched: a warm in-memory cache must skip the CSV and its Parquet side-car alike.
+        with mock.patch("dosimetry_app.datasets.pd.read_csv") as read_csv, mock.patch(
+            "dosimetry_app.datasets.pd.read_parquet"
+        ) as read_parquet:
+            _, frame = get_active_dataset("environmental_data")
+            frame["extra"] = 1
+            _, again = get_active_dataset("environmental_data")
+        read_csv.assert_not_called()
+        read_parquet.assert_not_called()
+        self.assertNotIn("extra", again.columns)
+
+    def test_eligible_datasets_match_python_filter(self):
+        expected = [
+            row["id"]
+            for row in list_datasets()
+            if row["validation_status"] == "passed" and row["status"] != "active"
+        ]
+        self.assertEqual([row["id"] for row in list_eligible_datasets()], expected)
+
+    def test_load_dataset_frame_matches_active_frame(self):
+        metadata, active = get_active_dataset("environmental_data")
+        frame = load_dataset_frame(int(metadata["id"]))
+        self.assertEqual(list(frame.columns), list(active.columns))
+        self.assertEqual(len(frame), len(active))
+        self.assertIsNone(load_dataset_frame(-1))
+        self.assertEqual(get_active_dataset_metadata("environmental_data")["id"], metadata["id"])
+
+    def test_system_environment_dataset_without_harare_is_refreshed_from_seed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = Path(tmp_dir) / "environmental_data.csv"
+            csv_path.write_text(
+                'location,temperature_c,pressure_kpa\n"Nairobi, Kenya",21.0,83.5\n', encoding="utf-8"
+            )
+            stale_id, errors = import_dataset_from_path(
+                "environmental_data", csv_path, uploaded_by="system", notes="stale seed", activate=True
+            )
+        self.assertEqual(errors, [])
+        self.assertEqual(get_active_dataset_metadata("environmental_data")["id"], stale_id)
+
+        ensure_africa_environment_dataset()
+        refreshed = get_active_dataset_metadata("environmental_data")
+        self.assertGreater(refreshed["id"], stale_id)
+        self.assertEqual(get_environment_from_dataset()["location"], "Harare, Zimbabwe")
+
+        # With Harare present, a second pass leaves the active dataset alone.
+        ensure_africa_environment_dataset()
+        self.assertEqual(get_active_dataset_metadata("environmental_data")["id"], refreshed["id"])
+
 
 if __name__ == "__main__":
     unittest.main()
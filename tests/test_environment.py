@@ -5,35 +5,50 @@ import pandas as pd
 
 from dosimetry_app.validators import validate_dataset
 from dosimetry_app.weather import (
+    IP_GEO_ENDPOINT,
+    NOMINATIM_REVERSE_ENDPOINT,
+    OPEN_METEO_ENDPOINT,
+    OPEN_METEO_GEOCODE_ENDPOINT,
+    OPEN_METEO_REVERSE_GEOCODE_ENDPOINT,
+    _fetch_json,
     auto_detect_environment,
     detect_location_from_ip,
     fetch_current_environment,
+    fetch_environment_and_reverse,
     geocode_location,
     reverse_geocode_coordinates,
 )
 
 
 class EnvironmentTests(unittest.TestCase):
+    def setUp(self):
+        # One patcher per test; each test registers canned payloads keyed by endpoint (URL without query).
+        self._responses: dict[str, dict] = {}
+        patcher = patch("dosimetry_app.weather._fetch_json", side_effect=self._fake_fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fake_fetch(self, url: str) -> dict:
+        return self._responses[url.split("?", 1)[0]]
+
     def test_validate_environmental_dataset(self):
         frame = pd.DataFrame(
-            [
-                {"location": "Clinic A", "temperature_c": 21.5, "pressure_kpa": 100.9},
-                {"location": "Clinic B", "temperature_c": 24.1, "pressure_kpa": 101.2},
-            ]
+            {
+                "location": ["Clinic A", "Clinic B"],
+                "temperature_c": [21.5, 24.1],
+                "pressure_kpa": [100.9, 101.2],
+            }
         )
         errors = validate_dataset("environmental_data", frame)
         self.assertEqual(errors, [])
 
     def test_validate_environmental_dataset_invalid_pressure(self):
-        frame = pd.DataFrame(
-            [{"location": "Clinic A", "temperature_c": 21.5, "pressure_kpa": 0.0}]
-        )
+        frame = pd.DataFrame({"location": ["Clinic A"], "temperature_c": [21.5], "pressure_kpa": [0.0]})
         errors = validate_dataset("environmental_data", frame)
         self.assertTrue(any("pressure_kpa" in err for err in errors))
 
-    @patch("dosimetry_app.weather._fetch_json")
-    def test_detect_location_from_ip(self, mock_fetch_json):
-        mock_fetch_json.return_value = {
+    def test_detect_location_from_ip(self):
+        self._responses[IP_GEO_ENDPOINT] = {
             "city": "Seattle",
             "region": "Washington",
             "country_name": "United States",
@@ -42,24 +57,22 @@ class EnvironmentTests(unittest.TestCase):
         }
         result = detect_location_from_ip()
         self.assertEqual(result["location_label"], "Seattle, Washington, United States")
-        self.assertAlmostEqual(result["latitude"], 47.61, places=2)
-        self.assertAlmostEqual(result["longitude"], -122.33, places=2)
+        self.assertAlmostEqual(result["latitude"], 47.61, delta=5e-3)
+        self.assertAlmostEqual(result["longitude"], -122.33, delta=5e-3)
 
-    @patch("dosimetry_app.weather._fetch_json")
-    def test_fetch_current_environment(self, mock_fetch_json):
-        mock_fetch_json.return_value = {
+    def test_fetch_current_environment(self):
+        self._responses[OPEN_METEO_ENDPOINT] = {
             "current": {
                 "temperature_2m": 18.4,
                 "surface_pressure": 1008.0,
             }
         }
         result = fetch_current_environment(47.61, -122.33)
-        self.assertAlmostEqual(result["temperature_c"], 18.4, places=3)
-        self.assertAlmostEqual(result["pressure_kpa"], 100.8, places=3)
+        self.assertAlmostEqual(result["temperature_c"], 18.4, delta=5e-4)
+        self.assertAlmostEqual(result["pressure_kpa"], 100.8, delta=5e-4)
 
-    @patch("dosimetry_app.weather._fetch_json")
-    def test_geocode_location_prefers_africa(self, mock_fetch_json):
-        mock_fetch_json.return_value = {
+    def test_geocode_location_prefers_africa(self):
+        self._responses[OPEN_METEO_GEOCODE_ENDPOINT] = {
             "results": [
                 {"name": "Harare", "country": "United States", "country_code": "US", "latitude": 38.0, "longitude": -85.0},
                 {"name": "Harare", "country": "Zimbabwe", "country_code": "ZW", "latitude": -17.8292, "longitude": 31.0522},
@@ -69,34 +82,30 @@ class EnvironmentTests(unittest.TestCase):
         self.assertIn("Zimbabwe", result["location_label"])
         self.assertEqual(result["country_code"], "ZW")
 
-    @patch("dosimetry_app.weather._fetch_json")
-    def test_auto_detect_environment_with_preferred_location(self, mock_fetch_json):
-        mock_fetch_json.side_effect = [
-            {
-                "results": [
-                    {
-                        "name": "Harare",
-                        "admin1": "Harare Province",
-                        "country": "Zimbabwe",
-                        "country_code": "ZW",
-                        "latitude": -17.8292,
-                        "longitude": 31.0522,
-                    }
-                ]
-            },
-            {"current": {"temperature_2m": 23.2, "surface_pressure": 859.0}},
-        ]
+    def test_auto_detect_environment_with_preferred_location(self):
+        self._responses[OPEN_METEO_GEOCODE_ENDPOINT] = {
+            "results": [
+                {
+                    "name": "Harare",
+                    "admin1": "Harare Province",
+                    "country": "Zimbabwe",
+                    "country_code": "ZW",
+                    "latitude": -17.8292,
+                    "longitude": 31.0522,
+                }
+            ]
+        }
+        self._responses[OPEN_METEO_ENDPOINT] = {"current": {"temperature_2m": 23.2, "surface_pressure": 859.0}}
         result = auto_detect_environment(preferred_location="Harare, Zimbabwe")
         self.assertEqual(result["provider"]["geolocation"], "open-meteo-geocoding")
         self.assertIn("Harare", result["location"])
         self.assertEqual(result["city"], "Harare")
         self.assertEqual(result["country"], "Zimbabwe")
-        self.assertAlmostEqual(result["temperature_c"], 23.2, places=3)
-        self.assertAlmostEqual(result["pressure_kpa"], 85.9, places=3)
+        self.assertAlmostEqual(result["temperature_c"], 23.2, delta=5e-4)
+        self.assertAlmostEqual(result["pressure_kpa"], 85.9, delta=5e-4)
 
-    @patch("dosimetry_app.weather._fetch_json")
-    def test_reverse_geocode_coordinates_prefers_africa(self, mock_fetch_json):
-        mock_fetch_json.return_value = {
+    def test_reverse_geocode_coordinates_prefers_africa(self):
+        self._responses[OPEN_METEO_REVERSE_GEOCODE_ENDPOINT] = {
             "results": [
                 {
                     "name": "Mutare",
@@ -118,26 +127,41 @@ class EnvironmentTests(unittest.TestCase):
         self.assertEqual(result["country"], "Zimbabwe")
         self.assertEqual(result["country_code"], "ZW")
 
-    @patch("dosimetry_app.weather._fetch_json")
-    def test_reverse_geocode_coordinates_falls_back_when_primary_empty(self, mock_fetch_json):
-        mock_fetch_json.side_effect = [
-            {"results": []},
-            {
-                "address": {
-                    "city": "Harare",
-                    "state": "Harare Metropolitan",
-                    "country": "Zimbabwe",
-                    "country_code": "zw",
-                },
-                "display_name": "Harare, Zimbabwe",
+    def test_reverse_geocode_coordinates_falls_back_when_primary_empty(self):
+        self._responses[OPEN_METEO_REVERSE_GEOCODE_ENDPOINT] = {"results": []}
+        self._responses[NOMINATIM_REVERSE_ENDPOINT] = {
+            "address": {
+                "city": "Harare",
+                "state": "Harare Metropolitan",
+                "country": "Zimbabwe",
+                "country_code": "zw",
             },
-        ]
+            "display_name": "Harare, Zimbabwe",
+        }
         result = reverse_geocode_coordinates(-17.8292, 31.0522)
         self.assertEqual(result["location_label"], "Harare, Zimbabwe")
         self.assertEqual(result["city"], "Harare")
         self.assertEqual(result["country"], "Zimbabwe")
         self.assertEqual(result["country_code"], "ZW")
 
+    @patch("dosimetry_app.weather.reverse_geocode_coordinates", side_effect=ValueError("offline"))
+    @patch("dosimetry_app.weather.fetch_current_environment", return_value={"temperature_c": 21.0})
+    def test_fetch_environment_and_reverse_tolerates_reverse_failure(self, mock_weather, mock_reverse):
+        weather, reverse_geo = fetch_environment_and_reverse(-17.83, 31.05)
+        self.assertEqual(weather, {"temperature_c": 21.0})
+        self.assertIsNone(reverse_geo)
+
+        fetch_environment_and_reverse(-17.83, 31.05, include_reverse=False)
+        self.assertEqual(mock_reverse.call_count, 1)
+
+    @patch("dosimetry_app.weather._request_json")
+    def test_fetch_json_reuses_cached_responses(self, mock_request_json):
+        mock_request_json.return_value = {"current": {}}
+        url = f"{OPEN_METEO_ENDPOINT}?latitude=1.0&longitude=2.0&cache_probe=1"
+        self.assertEqual(_fetch_json(url), {"current": {}})
+        self.assertEqual(_fetch_json(url), {"current": {}})
+        mock_request_json.assert_called_once_with(url)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from dosimetry_app.database import execute
+from dosimetry_app.runs import count_runs, get_run, list_run_summaries, list_runs, record_run
+from tests.isolation import use_temp_data_dir
+
+
+class RunsTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        use_temp_data_dir(cls)
+
+    def test_count_runs_matches_listing_and_respects_limit(self):
+        record_run(
+            user_id=None,
+            username="tester",
+            beam_type="photon",
+            inputs={},
+            outputs={},
+            formula_name="dw_default",
+            formula_version=1,
+            dataset_versions={},
+        )
+        total = count_runs()
+        self.assertGreaterEqual(total, 1)
+        self.assertEqual(count_runs(limit=200), len(list_runs(limit=200)))
+        self.assertEqual(count_runs(limit=1), 1)
+
+    def test_run_summaries_extract_dose_without_decoding_payloads(self):
+        run_id = record_run(
+            user_id=None,
+            username="tester",
+            beam_type="photon",
+            inputs={"M_raw": 1.0},
+            outputs={"outputs": {"dose_per_100mu_gy": 1.234}},
+            formula_name="dw_default",
+            formula_version=1,
+            dataset_versions={},
+        )
+        summary = next(row for row in list_run_summaries(limit=500) if row["id"] == run_id)
+        self.assertAlmostEqual(summary["dose_per_100mu_gy"], 1.234)
+        self.assertNotIn("outputs_json", summary)
+
+    def test_non_finite_values_are_stored_as_null(self):
+        run_id = record_run(
+            user_id=None,
+            username="tester",
+            beam_type="photon",
+            inputs={"M_raw": float("nan")},
+            outputs={"outputs": {"dose_per_100mu_gy": float("inf")}},
+            formula_name="dw_default",
+            formula_version=1,
+            dataset_versions={},
+        )
+        run = get_run(run_id)
+        self.assertIsNone(run["inputs"]["M_raw"])
+        self.assertIsNone(run["outputs"]["outputs"]["dose_per_100mu_gy"])
+        summary = next(row for row in list_run_summaries(limit=500) if row["id"] == run_id)
+        self.assertIsNone(summary["dose_per_100mu_gy"])
+
+    def test_run_summaries_tolerate_legacy_nan_payloads(self):
+        run_id = execute(
+            """
+            INSERT INTO calculator_runs (
+                user_id, username, beam_type, inputs_json, outputs_json,
+                formula_name, formula_version, dataset_versions_json
+            )
+            VALUES (NULL, 'tester', 'photon', '{}', '{"outputs": {"dose_per_100mu_gy": NaN}}', 'dw_default', 1, '{}')
+            """,
+            (),
+        )
+        summary = next(row for row in list_run_summaries(limit=500) if row["id"] == run_id)
+        self.assertIsNone(summary["dose_per_100mu_gy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,19 +1,26 @@
 import unittest
+from unittest.mock import patch
 
-from dosimetry_app.bootstrap import initialize_application
+from dosimetry_app.database import transaction
 from dosimetry_app.settings import (
     DEFAULT_SETTINGS,
     ENV_SOURCE_DATASET,
     ENV_SOURCE_MANUAL,
     apply_live_detection_defaults_for_legacy_installations,
     get_environment_settings,
+    get_setting,
     save_environment_settings,
+    set_setting,
 )
+from tests.isolation import use_temp_data_dir
 
 
 class SettingsTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        use_temp_data_dir(cls)
+
     def setUp(self):
-        initialize_application()
         save_environment_settings(
             env_source=DEFAULT_SETTINGS["env_source"],
             env_manual_temperature_c=float(DEFAULT_SETTINGS["env_manual_temperature_c"]),
@@ -49,26 +56,49 @@ class SettingsTests(unittest.TestCase):
             env_dataset_location="",
         )
 
+    def test_settings_are_read_once_until_written(self):
+        get_environment_settings()
+        with patch("dosimetry_app.settings.query_rows") as mock_query:
+            get_environment_settings()
+        mock_query.assert_not_called()
+
+        set_setting("cache_probe", "first")
+        self.assertEqual(get_setting("cache_probe"), "first")
+        set_setting("cache_probe", "second")
+        self.assertEqual(get_setting("cache_probe"), "second")
+
+    def test_rolled_back_settings_are_not_cached(self):
+        with self.assertRaises(RuntimeError):
+            with transaction():
+                set_setting("cache_probe", "uncommitted")
+                self.assertEqual(get_setting("cache_probe"), "uncommitted")
+                raise RuntimeError("abort")
+
+        self.assertNotEqual(get_setting("cache_probe"), "uncommitted")
+
     def test_legacy_defaults_migrate_to_live_detection(self):
-        save_environment_settings(
-            env_source=ENV_SOURCE_MANUAL,
-            env_manual_temperature_c=20.6,
-            env_manual_pressure_kpa=98.18,
-            env_dataset_location="",
-        )
-        apply_live_detection_defaults_for_legacy_installations()
+        # Seeding the legacy values and migrating them share one commit.
+        with transaction():
+            save_environment_settings(
+                env_source=ENV_SOURCE_MANUAL,
+                env_manual_temperature_c=20.6,
+                env_manual_pressure_kpa=98.18,
+                env_dataset_location="",
+            )
+            apply_live_detection_defaults_for_legacy_installations()
         settings = get_environment_settings()
         self.assertEqual(settings["env_source"], DEFAULT_SETTINGS["env_source"])
         self.assertEqual(settings["env_dataset_location"], DEFAULT_SETTINGS["env_dataset_location"])
 
     def test_harare_defaults_migrate_to_live_detection(self):
-        save_environment_settings(
-            env_source=ENV_SOURCE_DATASET,
-            env_manual_temperature_c=22.0,
-            env_manual_pressure_kpa=85.9,
-            env_dataset_location="Harare, Zimbabwe",
-        )
-        apply_live_detection_defaults_for_legacy_installations()
+        with transaction():
+            save_environment_settings(
+                env_source=ENV_SOURCE_DATASET,
+                env_manual_temperature_c=22.0,
+                env_manual_pressure_kpa=85.9,
+                env_dataset_location="Harare, Zimbabwe",
+            )
+            apply_live_detection_defaults_for_legacy_installations()
         settings = get_environment_settings()
         self.assertEqual(settings["env_source"], DEFAULT_SETTINGS["env_source"])
         self.assertEqual(settings["env_dataset_location"], DEFAULT_SETTINGS["env_dataset_location"])